@@ -24,4 +24,6 @@ fi
 # Initialize the database with PostGIS extension
 psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "recalldb" <<-EOSQL
     CREATE EXTENSION IF NOT EXISTS postgis;
+    CREATE EXTENSION IF NOT EXISTS btree_gist;
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
 EOSQL
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""add ingest state table
+
+Revision ID: 3f1c2a7d9b10
+Revises: 
+Create Date: 2026-10-17 09:12:41.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the table may already exist if it was created by db.create_all
+    if sa.inspect(op.get_bind()).has_table('ingest_state'):
+        return
+    op.create_table(
+        'ingest_state',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('radar', sa.String(length=10), nullable=False),
+        sa.Column('product', sa.String(length=10), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id', 'radar', 'product', 'timestamp'),
+    )
+
+
+def downgrade():
+    op.drop_table('ingest_state')
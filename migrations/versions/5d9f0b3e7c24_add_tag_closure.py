@@ -0,0 +1,71 @@
+"""add tag closure table and event_tag (tag_id, event_id) index
+
+Revision ID: 5d9f0b3e7c24
+Revises: c47a91e2f3d8
+Create Date: 2026-10-17 14:22:53.108374
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9f0b3e7c24'
+down_revision = 'c47a91e2f3d8'
+branch_labels = None
+depends_on = None
+
+TAG_CLOSURE_DDL = """
+CREATE OR REPLACE FUNCTION rebuild_tag_closure() RETURNS void AS $$
+BEGIN
+    DELETE FROM tag_closure;
+    INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM tag
+        UNION
+        SELECT closure.ancestor_id, tag_tag.child_tag_id, closure.depth + 1
+        FROM closure JOIN tag_tag ON tag_tag.parent_tag_id = closure.descendant_id
+        WHERE closure.depth < 32
+    )
+    SELECT ancestor_id, descendant_id, min(depth) FROM closure GROUP BY ancestor_id, descendant_id;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION refresh_tag_closure() RETURNS trigger AS $$
+BEGIN
+    PERFORM rebuild_tag_closure();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER tag_closure_refresh AFTER INSERT OR DELETE ON tag
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_tag_closure();
+CREATE OR REPLACE TRIGGER tag_closure_refresh AFTER INSERT OR UPDATE OR DELETE ON tag_tag
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_tag_closure();
+"""
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_event_tag_tag_id_event_id ON event_tag (tag_id, event_id)')
+    if not sa.inspect(op.get_bind()).has_table('tag_closure'):
+        op.create_table(
+            'tag_closure',
+            sa.Column('ancestor_id', sa.Integer(), nullable=False),
+            sa.Column('descendant_id', sa.Integer(), nullable=False),
+            sa.Column('depth', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['ancestor_id'], ['tag.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['descendant_id'], ['tag.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+        )
+        op.create_index('ix_tag_closure_descendant_id', 'tag_closure', ['descendant_id'])
+    op.execute(TAG_CLOSURE_DDL)
+    op.execute('SELECT rebuild_tag_closure()')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS tag_closure_refresh ON tag_tag')
+    op.execute('DROP TRIGGER IF EXISTS tag_closure_refresh ON tag')
+    op.execute('DROP FUNCTION IF EXISTS refresh_tag_closure()')
+    op.execute('DROP FUNCTION IF EXISTS rebuild_tag_closure()')
+    op.drop_table('tag_closure')
+    op.drop_index('ix_event_tag_tag_id_event_id', table_name='event_tag')
@@ -0,0 +1,23 @@
+"""add event (start_time, id) index for keyset pagination
+
+Revision ID: 8b2e4d0c6a51
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-17 11:40:05.902114
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d0c6a51'
+down_revision = '3f1c2a7d9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_event_start_time_id ON event (start_time, id)')
+
+
+def downgrade():
+    op.drop_index('ix_event_start_time_id', table_name='event')
@@ -0,0 +1,23 @@
+"""add index on ingest state update time
+
+Revision ID: a4d8f2c61e07
+Revises: e1a6c58b9f42
+Create Date: 2026-10-17 18:42:05.106318
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8f2c61e07'
+down_revision = 'e1a6c58b9f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_ingest_state_updated_at', 'ingest_state', ['updated_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_ingest_state_updated_at', table_name='ingest_state')
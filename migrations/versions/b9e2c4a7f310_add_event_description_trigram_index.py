@@ -0,0 +1,24 @@
+"""add trigram index on event description
+
+Revision ID: b9e2c4a7f310
+Revises: a4d8f2c61e07
+Create Date: 2026-10-17 19:26:48.553091
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e2c4a7f310'
+down_revision = 'a4d8f2c61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_event_description_trgm ON event USING gin (description gin_trgm_ops)')
+
+
+def downgrade():
+    op.drop_index('ix_event_description_trgm', table_name='event')
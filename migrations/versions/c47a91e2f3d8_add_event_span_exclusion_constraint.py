@@ -0,0 +1,45 @@
+"""add event time span column and overlap exclusion constraint
+
+Existing overlapping events of the same radar must be resolved before
+upgrading, or creating the constraint fails.
+
+Revision ID: c47a91e2f3d8
+Revises: 8b2e4d0c6a51
+Create Date: 2026-10-17 13:05:27.441876
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47a91e2f3d8'
+down_revision = '8b2e4d0c6a51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    # the column and constraint may already exist if they were created by db.create_all
+    inspector = sa.inspect(op.get_bind())
+    if 'span' not in {column['name'] for column in inspector.get_columns('event')}:
+        op.add_column('event', sa.Column(
+            'span', postgresql.TSRANGE(),
+            sa.Computed("tsrange(start_time, end_time, '[]')", persisted=True),
+        ))
+    exists = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_constraint WHERE conname = 'event_no_overlap'"
+    )).scalar()
+    if not exists:
+        op.create_exclude_constraint(
+            'event_no_overlap', 'event',
+            ('radar_id', '='), ('span', '&&'),
+            using='gist',
+        )
+
+
+def downgrade():
+    op.drop_constraint('event_no_overlap', 'event')
+    op.drop_column('event', 'span')
@@ -0,0 +1,121 @@
+"""maintain the tag closure incrementally
+
+Replaces the statement level triggers rebuilding the whole closure with row
+level triggers that update only the pairs of tags affected by a change.
+
+Revision ID: d3a7e5b81c96
+Revises: b9e2c4a7f310
+Create Date: 2026-10-17 18:41:09.527318
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7e5b81c96'
+down_revision = 'b9e2c4a7f310'
+branch_labels = None
+depends_on = None
+
+TAG_CLOSURE_DDL = """
+DROP TRIGGER IF EXISTS tag_closure_refresh ON tag_tag;
+DROP TRIGGER IF EXISTS tag_closure_refresh ON tag;
+DROP FUNCTION IF EXISTS refresh_tag_closure();
+
+-- link all ancestors of the parent, including itself, to all descendants of the child
+CREATE OR REPLACE FUNCTION tag_closure_add_edge(parent integer, child integer) RETURNS void AS $$
+BEGIN
+    INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, min(a.depth + 1 + d.depth)
+    FROM tag_closure a JOIN tag_closure d ON a.descendant_id = parent AND d.ancestor_id = child
+    GROUP BY a.ancestor_id, d.descendant_id
+    ON CONFLICT (ancestor_id, descendant_id) DO UPDATE
+        SET depth = LEAST(tag_closure.depth, EXCLUDED.depth);
+END
+$$ LANGUAGE plpgsql;
+
+-- only paths from the ancestors of the parent to the descendants of the child
+-- can pass through the removed edge, so only those pairs are recomputed
+CREATE OR REPLACE FUNCTION tag_closure_remove_edge(parent integer, child integer) RETURNS void AS $$
+DECLARE
+    ancestors integer[];
+    descendants integer[];
+BEGIN
+    SELECT array_agg(ancestor_id) INTO ancestors FROM tag_closure WHERE descendant_id = parent;
+    SELECT array_agg(descendant_id) INTO descendants FROM tag_closure WHERE ancestor_id = child;
+    DELETE FROM tag_closure
+    WHERE ancestor_id = ANY(ancestors) AND descendant_id = ANY(descendants) AND depth > 0;
+    INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE closure(ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM unnest(ancestors) AS id
+        UNION
+        SELECT closure.ancestor_id, tag_tag.child_tag_id, closure.depth + 1
+        FROM closure JOIN tag_tag ON tag_tag.parent_tag_id = closure.descendant_id
+        WHERE closure.depth < 32
+    )
+    SELECT ancestor_id, descendant_id, min(depth) FROM closure
+    WHERE depth > 0 AND descendant_id = ANY(descendants)
+    GROUP BY ancestor_id, descendant_id
+    ON CONFLICT (ancestor_id, descendant_id) DO UPDATE
+        SET depth = LEAST(tag_closure.depth, EXCLUDED.depth);
+END
+$$ LANGUAGE plpgsql;
+
+-- deleted tags are removed from the closure by the cascading foreign keys
+CREATE OR REPLACE FUNCTION tag_closure_tag_inserted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+    VALUES (NEW.id, NEW.id, 0) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tag_closure_edge_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM tag_closure_remove_edge(OLD.parent_tag_id, OLD.child_tag_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM tag_closure_add_edge(NEW.parent_tag_id, NEW.child_tag_id);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER tag_closure_tag AFTER INSERT ON tag
+    FOR EACH ROW EXECUTE FUNCTION tag_closure_tag_inserted();
+CREATE OR REPLACE TRIGGER tag_closure_edge AFTER INSERT OR UPDATE OR DELETE ON tag_tag
+    FOR EACH ROW EXECUTE FUNCTION tag_closure_edge_changed();
+"""
+
+# the full rebuild of the previous revision
+REFRESH_DDL = """
+DROP TRIGGER IF EXISTS tag_closure_edge ON tag_tag;
+DROP TRIGGER IF EXISTS tag_closure_tag ON tag;
+DROP FUNCTION IF EXISTS tag_closure_edge_changed();
+DROP FUNCTION IF EXISTS tag_closure_tag_inserted();
+DROP FUNCTION IF EXISTS tag_closure_remove_edge(integer, integer);
+DROP FUNCTION IF EXISTS tag_closure_add_edge(integer, integer);
+
+CREATE OR REPLACE FUNCTION refresh_tag_closure() RETURNS trigger AS $$
+BEGIN
+    PERFORM rebuild_tag_closure();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER tag_closure_refresh AFTER INSERT OR DELETE ON tag
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_tag_closure();
+CREATE OR REPLACE TRIGGER tag_closure_refresh AFTER INSERT OR UPDATE OR DELETE ON tag_tag
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_tag_closure();
+"""
+
+
+def upgrade():
+    op.execute(TAG_CLOSURE_DDL)
+    # rebuild_tag_closure() of the previous revision, for tags inserted without triggers
+    op.execute('SELECT rebuild_tag_closure()')
+
+
+def downgrade():
+    op.execute(REFRESH_DDL)
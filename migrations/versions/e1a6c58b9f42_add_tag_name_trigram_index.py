@@ -0,0 +1,24 @@
+"""add trigram index on tag name
+
+Revision ID: e1a6c58b9f42
+Revises: 5d9f0b3e7c24
+Create Date: 2026-10-17 15:03:11.720459
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a6c58b9f42'
+down_revision = '5d9f0b3e7c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_tag_name_trgm ON tag USING gin (name gin_trgm_ops)')
+
+
+def downgrade():
+    op.drop_index('ix_tag_name_trgm', table_name='tag')
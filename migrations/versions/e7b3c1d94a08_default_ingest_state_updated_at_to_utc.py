@@ -0,0 +1,27 @@
+"""default ingest state update time to UTC
+
+The column holds naive UTC times, like the ingest state timestamps it is
+compared to, so the default no longer depends on the database time zone.
+
+Revision ID: e7b3c1d94a08
+Revises: d3a7e5b81c96
+Create Date: 2026-10-17 20:12:36.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c1d94a08'
+down_revision = 'd3a7e5b81c96'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('ingest_state', 'updated_at', server_default=sa.text("timezone('UTC', now())"))
+
+
+def downgrade():
+    op.alter_column('ingest_state', 'updated_at', server_default=sa.text('now()'))
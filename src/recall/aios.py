@@ -1,10 +1,15 @@
-from dash import html, dcc, Output, Input, State, callback, MATCH
-from dash.exceptions import PreventUpdate
+from dash import html, dcc, Output, Input, State, clientside_callback, MATCH
 import dash_bootstrap_components as dbc
 import uuid
 
 
 class PlaybackSliderAIO(html.Div):
+    """Slider with a play button for animating through its values.
+
+    Playback runs entirely in the browser. `fps` sets the frame rate, and
+    `mode` is either 'loop' to restart from the beginning or 'bounce' to
+    reverse direction at either end.
+    """
 
     class ids:
         play = lambda aio_id: {
@@ -27,6 +32,11 @@ class PlaybackSliderAIO(html.Div):
             'subcomponent': 'interval',
             'aio_id': aio_id
         }
+        store = lambda aio_id: {
+            'component': 'PlaybackSliderAIO',
+            'subcomponent': 'store',
+            'aio_id': aio_id
+        }
 
     ids = ids
 
@@ -35,6 +45,8 @@ class PlaybackSliderAIO(html.Div):
         button_props=None,
         slider_props=None,
         interval_props=None,
+        fps=None,
+        mode='loop',
         aio_id=None
     ):
         if aio_id is None:
@@ -43,7 +55,9 @@ class PlaybackSliderAIO(html.Div):
         button_props = button_props.copy() if button_props else {}
         slider_props = slider_props.copy() if slider_props else {}
         interval_props = interval_props.copy() if interval_props else {}
-        
+        if fps:
+            interval_props['interval'] = 1000/fps
+
         button_props['active'] = False
 
         super().__init__([
@@ -56,34 +70,52 @@ class PlaybackSliderAIO(html.Div):
                 dbc.Col(dcc.Slider(id=self.ids.slider(aio_id), className='md-3', **slider_props)),
             ]),
             dcc.Interval(id=self.ids.interval(aio_id), **interval_props),
+            dcc.Store(id=self.ids.store(aio_id), data={'mode': mode, 'direction': 1}),
         ])
 
-    @callback(
+    clientside_callback(
+        """
+        function(clicks, active) {
+            if (clicks) {
+                return [!active, active ? 'fa-solid fa-play' : 'fa-solid fa-pause', active];
+            }
+            return [active, 'fa-solid fa-play', !active];
+        }
+        """,
         Output(ids.play(MATCH), 'active'),
         Output(ids.play_icon(MATCH), 'className'),
         Output(ids.interval(MATCH), 'disabled'),
         Input(ids.play(MATCH), 'n_clicks'),
         State(ids.play(MATCH), 'active')
     )
-    def toggle_play(clicks, curr_status):
-        if clicks:
-            text = 'fa-solid fa-play' if curr_status else 'fa-solid fa-pause'
-            return not curr_status, text, curr_status
-        return curr_status, 'fa-solid fa-play', not curr_status
 
-    @callback(
+    clientside_callback(
+        """
+        function(n_intervals, play, min, max, step, value, state) {
+            const no_update = window.dash_clientside.no_update;
+            if (!play) {
+                return [no_update, no_update];
+            }
+            let direction = state.direction || 1;
+            let newVal = value + direction*step;
+            if (newVal > max || newVal < min) {
+                if (state.mode === 'bounce') {
+                    direction = -direction;
+                    newVal = Math.min(Math.max(value + direction*step, min), max);
+                } else {
+                    newVal = min;
+                }
+            }
+            return [newVal, Object.assign({}, state, {direction: direction})];
+        }
+        """,
         Output(ids.slider(MATCH), 'value'),
-        Input(ids.play(MATCH), 'active'),
+        Output(ids.store(MATCH), 'data'),
         Input(ids.interval(MATCH), 'n_intervals'),
+        State(ids.play(MATCH), 'active'),
         State(ids.slider(MATCH), 'min'),
         State(ids.slider(MATCH), 'max'),
         State(ids.slider(MATCH), 'step'),
-        State(ids.slider(MATCH), 'value')
+        State(ids.slider(MATCH), 'value'),
+        State(ids.store(MATCH), 'data'),
     )
-    def start_playback(play, interval, min, max, step, value):
-        if not play:
-            raise PreventUpdate
-        new_val = value + step
-        if new_val > max:
-            new_val = min
-        return new_val
\ No newline at end of file
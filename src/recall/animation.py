@@ -0,0 +1,101 @@
+"""Render event animations from the ingested GeoTIFFs.
+
+Frames are rendered in a process pool using the same colormap as the tile
+server, and the encoded animations are cached on disk. The pool is billiard's,
+as rendering runs in celery prefork workers, which are daemonic processes
+that the standard library does not allow to have children.
+"""
+
+import os
+import datetime
+
+import billiard
+import numpy as np
+import rasterio
+from PIL import Image, ImageDraw
+
+from recall.colormaps import product_colormap, load_lut
+from recall.database.timeline import event_timeline
+from recall.terracotta.driver import get_driver
+
+
+ANIMATION_DIR = os.environ.get('RECALL_ANIMATION_DIR', '/tmp/recall/animations')
+ANIMATION_WORKERS = int(os.environ.get('RECALL_ANIMATION_WORKERS', os.cpu_count() or 1))
+FORMATS = ('gif', 'webp', 'mp4')
+MIME_TYPES = {'gif': 'image/gif', 'webp': 'image/webp', 'mp4': 'video/mp4'}
+BACKGROUND = (255, 255, 255)
+
+
+def animation_path(event_id: int, start_time: datetime.datetime, end_time: datetime.datetime,
+                   product: str, fmt: str, n_frames: int, last_frame: str) -> str:
+    """Cache path of an animation.
+
+    The number of frames and the timestamp of the last frame are part of the
+    path, so animations rendered before the ingest was complete are not reused.
+    """
+    tfmt = '%Y%m%d%H%M'
+    filename = (f'{event_id}_{start_time.strftime(tfmt)}_{end_time.strftime(tfmt)}_{product}'
+                f'_{n_frames}_{last_frame}.{fmt}')
+    return os.path.join(ANIMATION_DIR, filename)
+
+
+def render_frame(path: str, lut, label: str = ''):
+    """Render a GeoTIFF as an RGB image using a colormap lookup table."""
+    with rasterio.Env(AWS_NO_SIGN_REQUEST='YES'):
+        with rasterio.open(path) as src:
+            data = src.read(1, masked=True)
+    rgba = lut[np.clip(data.filled(0), 0, len(lut) - 1)]
+    rgba[np.ma.getmaskarray(data)] = 0
+    image = Image.new('RGB', (rgba.shape[1], rgba.shape[0]), BACKGROUND)
+    image.paste(Image.fromarray(rgba, 'RGBA'), mask=Image.fromarray(rgba[..., 3]))
+    if label:
+        ImageDraw.Draw(image).text((10, 10), label, fill=(0, 0, 0))
+    return np.asarray(image)
+
+
+def render_frames(paths, labels, lut, max_workers=ANIMATION_WORKERS):
+    """Render frames in parallel in a process pool."""
+    with billiard.Pool(processes=max(1, min(max_workers, len(paths)))) as pool:
+        return pool.starmap(render_frame, [(path, lut, label) for path, label in zip(paths, labels)])
+
+
+def encode(frames, path: str, fmt: str, fps: float = 5):
+    """Encode frames to an animation file."""
+    if fmt == 'mp4':
+        try:
+            import imageio.v2 as imageio
+        except ImportError as e:
+            raise ValueError('MP4 export requires imageio with ffmpeg: pip install recall[animation]') from e
+        # most video codecs require dimensions divisible by 2
+        frames = [frame[:frame.shape[0]//2*2, :frame.shape[1]//2*2] for frame in frames]
+        imageio.mimwrite(path, frames, fps=fps)
+        return
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(path, format=fmt.upper(), save_all=True, append_images=images[1:],
+                   duration=int(1000/fps), loop=0)
+
+
+def render_event(event, fmt: str = 'gif', product: str = 'DBZH', fps: float = 5):
+    """Render an animation of an event, returning the path of the cached file."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported animation format: {fmt}')
+    timestamps = event_timeline(event, product=product).tolist()
+    tstrs = [timestamp.strftime('%Y%m%d%H%M') for timestamp in timestamps]
+    driver = get_driver()
+    datasets = driver.get_datasets(where={'radar': event.radar.name, 'product': product, 'timestamp': tstrs})
+    frame_keys = sorted(datasets)
+    if not frame_keys:
+        raise ValueError(f'No ingested frames for event {event.id}')
+    path = animation_path(event.id, event.start_time, event.end_time, product, fmt,
+                          n_frames=len(frame_keys), last_frame=frame_keys[-1][0])
+    if os.path.exists(path):
+        return path
+    paths = [datasets[keys] for keys in frame_keys]
+    labels = [datetime.datetime.strptime(keys[0], '%Y%m%d%H%M').strftime('%Y-%m-%d %H:%M UTC') + f' {keys[1]}'
+              for keys in frame_keys]
+    frames = render_frames(paths, labels, load_lut(product_colormap(product)))
+    os.makedirs(ANIMATION_DIR, exist_ok=True)
+    tmp_path = os.path.join(ANIMATION_DIR, f'.{os.getpid()}_{os.path.basename(path)}')
+    encode(frames, tmp_path, fmt, fps=fps)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,72 @@
+"""In-process caching utilities."""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded least recently used cache with expiring entries.
+
+    Entries older than `ttl` seconds are treated as missing. If `ttl` is None,
+    entries only expire through eviction or invalidation. The ttl can also be
+    given per entry when setting it. The cache is safe to use from multiple
+    threads.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Get a cached value, or `default` if missing or expired."""
+        with self._lock:
+            try:
+                stored_at, ttl, value = self._data[key]
+            except KeyError:
+                return default
+            if ttl is not None and time.monotonic() - stored_at > ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=_MISSING):
+        """Store a value, evicting the least recently used entries if full.
+
+        The entry expires after `ttl` seconds, by default the cache's ttl.
+        """
+        if ttl is _MISSING:
+            ttl = self.ttl
+        with self._lock:
+            self._data[key] = (time.monotonic(), ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, fun, *args, **kws):
+        """Get a cached value, computing and storing it with `fun` if missing."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fun(*args, **kws)
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=_MISSING):
+        """Drop one entry, or all entries if no key is given."""
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
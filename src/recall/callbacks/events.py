@@ -1,13 +1,17 @@
 """Callbacks for the events tab."""
 
-from dash import Input, Output, State, callback
+import datetime
+
+from dash import Input, Output, State, callback, ctx
 from dash.exceptions import PreventUpdate
 
 from recall.aios import PlaybackSliderAIO
-from recall.database import list_scan_timestamps
 from recall.database.connection import db
-from recall.database.models import Event, Radar, Tag
-from recall.utils import timestamp_marks
+from recall.database.event_cache import get_event_summary, invalidate_event
+from recall.database.models import Event
+from recall.database.radars import radars
+from recall.database.queries import event_rows, event_label, search_events
+from recall.database.tag_cache import get_tags, invalidate_tags
 
 
 @callback(
@@ -30,56 +34,100 @@ def disable_add_event_button(start_time, end_time, radar_id: int):
     return not all([start_time, end_time, radar_id])
 
 
+def event_option(row):
+    # search text for the client side filtering of the dropdown
+    search = f"{event_label(row)} {row.description or ''}"
+    return {'label': event_label(row), 'value': row.id, 'search': search}
+
+
 @callback(
     Output('event-dropdown', 'options'),
+    Output('event-page-cursor', 'data'),
+    Output('event-dropdown-more', 'disabled'),
+    Output('event-search', 'data'),
+    Output('event-search-clear', 'disabled'),
+    Input('event-dropdown', 'search_value'),
+    Input('event-dropdown-more', 'n_clicks'),
+    Input('event-search-clear', 'n_clicks'),
     Input('events-update-signal', 'data'),
-    Input('startup-interval', 'disabled')
+    Input('startup-interval', 'disabled'),
+    Input('event-tag-filter', 'value'),
+    State('event-search', 'data'),
+    State('event-page-cursor', 'data'),
+    State('event-dropdown', 'options'),
+    State('event-dropdown', 'value'),
 )
-def populate_event_dropdown(_, __):
-    """Populate the event dropdown with events from the database."""
-    events = db.session.query(Event).order_by(Event.start_time).all()
-    if not events:
+def populate_event_dropdown(search_value, _, __, signal, ___, tag_ids, search, cursor, options, event_id: int):
+    """Populate the event dropdown with matching events a page at a time.
+
+    The search term is kept in a store, as the dropdown clears its search
+    value when it loses focus, e.g. when the more button is clicked. Clicking
+    the more button appends the next page to the options. Events can be
+    filtered by tags, including their descendant tags. The selected event is
+    always included.
+    """
+    if ctx.triggered_id == 'event-dropdown':
+        if not search_value:  # cleared on losing focus
+            raise PreventUpdate
+        search = search_value
+    elif ctx.triggered_id == 'event-search-clear':
+        search = None
+    after = None
+    if ctx.triggered_id == 'event-dropdown-more' and cursor:
+        after = (datetime.datetime.fromisoformat(cursor[0]), cursor[1])
+    else:
+        options = []
+    rows, next_cursor = search_events(search, after=after, tag_ids=tag_ids)
+    if not rows and not after and not search and not tag_ids:
         print('No events found')
         raise PreventUpdate
-    # Label is the event start date and radar name
-    options = []
-    for event in events:
-        tags = ', '.join([tag.name for tag in event.tags])
-        label = f"{event.start_time.strftime('%Y-%m-%d')} {event.radar.name}"
-        if tags:
-            label += f": {tags}"
-        options.append({'label': label, 'value': event.id})
-    return options
-
+    options = list(options or [])
+    listed = {option['value'] for option in options}
+    options += [event_option(row) for row in rows if row.id not in listed]
+    listed.update(row.id for row in rows)
+    if event_id and event_id not in listed:
+        selected = event_rows().filter(Event.id == event_id).first()
+        if selected:
+            options.insert(0, event_option(selected))
+    if next_cursor:
+        next_cursor = (next_cursor[0].isoformat(), next_cursor[1])
+    return options, next_cursor, next_cursor is None, search, not search
 
 
 @callback(
     Output('radar-picker', 'options'),
+    Output('export-radars', 'options'),
     Input('startup-interval', 'disabled')
 )
 def populate_radar_picker(_):
-    """Populate the radar picker with radars from the database."""
-    radars = db.session.query(Radar).order_by(Radar.name).all()
-    if not radars:
+    """Populate the radar pickers with radars from the registry."""
+    radar_list = radars.all()
+    if not radar_list:
         print('No radars found')
         raise PreventUpdate
-    options = [{'label': radar.name, 'value': radar.id} for radar in radars]
-    return options
+    options = [{'label': radar.name, 'value': radar.id} for radar in radar_list]
+    export_options = [{'label': radar.name, 'value': radar.name} for radar in radar_list]
+    return options, export_options
 
 
 @callback(
     Output('tag-picker', 'options'),
+    Output('event-tag-filter', 'options'),
+    Output('export-tags', 'options'),
     Input('startup-interval', 'disabled'),
     Input('tag-update-signal', 'data'),
 )
 def populate_tag_picker(_, __):
-    """Populate the tag picker with tags from the database."""
-    tags = db.session.query(Tag).order_by(Tag.name).all()
+    """Populate the tag pickers and filters with tags from the database."""
+    if ctx.triggered_id == 'tag-update-signal':
+        invalidate_tags()
+    tags = get_tags()
     if not tags:
         print('No tags found')
         raise PreventUpdate
     options = [{'label': tag.name, 'value': tag.id} for tag in tags]
-    return options
+    export_options = [{'label': tag.name, 'value': tag.name} for tag in tags]
+    return options, options, export_options
 
 @callback(
     Output('start-time', 'value'),
@@ -90,20 +138,21 @@ def populate_tag_picker(_, __):
     Output('delete-event', 'disabled'),
     Output('save-event', 'disabled'),
     Output('playback-container', 'hidden'),
+    Output('export-animation', 'disabled'),
     Input('event-dropdown', 'value'),
     Input('startup-interval', 'disabled')
 )
 def update_selected_event(event_id: int, _):
     """Update the selected event text based on the selected event."""
-    if event_id:
-        event = db.session.query(Event).get(event_id)
+    event = get_event_summary(event_id) if event_id else None
+    if event:
         start_time = event.start_time.isoformat()
         end_time = event.end_time.isoformat()
         description = event.description
-        radar_id = event.radar.id
-        tag_ids = [tag.id for tag in event.tags]
-        return start_time, end_time, description, radar_id, tag_ids, False, False, False
-    return '', '', '', None, [], True, True, True
+        radar_id = event.radar_id
+        tag_ids = event.tag_ids
+        return start_time, end_time, description, radar_id, tag_ids, False, False, False, False
+    return '', '', '', None, [], True, True, True, True
 
 
 @callback(
@@ -121,7 +170,8 @@ def delete_event(n_clicks, event_id: int):
     event = db.session.query(Event).get(event_id)
     db.session.delete(event)
     db.session.commit()
-    return 0, None, {'status': 'deleted'}
+    invalidate_event(event_id)
+    return 0, None, {'status': 'deleted', 'id': event_id}
 
 
 @callback(
@@ -130,11 +180,9 @@ def delete_event(n_clicks, event_id: int):
     Input('event-dropdown', 'value'),
     Input('events-update-signal', 'data')
 )
-def update_slider_marks(event_id: int, _):
+def update_slider_marks(event_id: int, signal):
     """Update the slider marks based on the selected event."""
-    if not event_id:
+    event = get_event_summary(event_id) if event_id else None
+    if not event:
         return {}, 1
-    event = db.session.query(Event).get(event_id)
-    timestamps = list_scan_timestamps(event)
-    marks = timestamp_marks(timestamps)
-    return marks, len(timestamps) - 1
\ No newline at end of file
+    return event.marks, len(event.timestamps) - 1
\ No newline at end of file
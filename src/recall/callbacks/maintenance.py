@@ -1,16 +1,73 @@
-from dash import Input, Output, callback
-import tomli_w
+import base64
+import binascii
+from urllib.parse import urlencode
 
-from recall.database.queries import events_list
+from dash import Input, Output, State, callback, no_update
+from dash.exceptions import PreventUpdate
+
+from recall.database.event_cache import invalidate_events
+from recall.database.importer import import_events, read_events, detect_format, queue_ingest
+from recall.database.radars import radars
+
+
+@callback(
+    Output('export-events', 'href'),
+    Input('export-format', 'value'),
+    Input('export-radars', 'value'),
+    Input('export-tags', 'value'),
+    Input('export-dates', 'start_date'),
+    Input('export-dates', 'end_date'),
+)
+def update_export_link(fmt: str, radar_names, tag_names, start_date: str, end_date: str):
+    """Link to the streaming export of the filtered events."""
+    params = [('radar', name) for name in radar_names or []]
+    params += [('tag', name) for name in tag_names or []]
+    if start_date:
+        params.append(('start', start_date))
+    if end_date:
+        params.append(('end', f'{end_date}T23:59:59'))
+    query = f'?{urlencode(params)}' if params else ''
+    return f'/export/events.{fmt}{query}'
+
+
+@callback(
+    Output('reload-radars', 'n_clicks'),
+    Input('reload-radars', 'n_clicks'),
+    prevent_initial_call=True
+)
+def reload_radars(n_clicks: int):
+    """Reload the radar registry of this process from the database."""
+    radars.refresh()
+    return 0
 
 
 @callback(
-    Output('download-toml', 'data'),
-    Input('btn-export-toml', 'n_clicks'),
+    Output('import-status', 'children'),
+    Output('events-update-signal', 'data', allow_duplicate=True),
+    Output('tag-update-signal', 'data', allow_duplicate=True),
+    Input('upload-events', 'contents'),
+    State('upload-events', 'filename'),
     prevent_initial_call=True
 )
-def export_toml(n_clicks: int):
-    """Export all events as a toml file."""
-    print('Exporting events to toml')
-    events = {'event': events_list()}
-    return dict(content=tomli_w.dumps(events), filename='events.toml', type='application/toml')
\ No newline at end of file
+def import_uploaded_events(contents: str, filename: str):
+    """Import events from an uploaded file and queue their ingest."""
+    if not contents:
+        raise PreventUpdate
+    print(f'Importing events from {filename}')
+    try:
+        content = base64.b64decode(contents.split(',', 1)[1]).decode('utf-8')
+    except (IndexError, binascii.Error, UnicodeDecodeError) as e:
+        return f'Could not read {filename}: {e}', no_update, no_update
+    try:
+        result = import_events(read_events(content, detect_format(filename)))
+    except ValueError as e:
+        return str(e), no_update, no_update
+    invalidate_events(result.event_ids)
+    n_tasks = queue_ingest(result.event_ids)
+    status = f'Imported {len(result.event_ids)} events from {filename}.'
+    if result.skipped:
+        status += f' Skipped {len(result.skipped)} overlapping events.'
+    if n_tasks:
+        status += f' Queued {n_tasks} ingest tasks.'
+    tag_signal = {'status': 'imported', 'n': len(result.created_tags)} if result.created_tags else no_update
+    return status, {'status': 'imported', 'n': len(result.event_ids)}, tag_signal
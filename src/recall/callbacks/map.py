@@ -1,44 +1,89 @@
-from dash import callback, Output, Input
+import os
+
+from dash import callback, clientside_callback, Output, Input
 import dash_leaflet as dl
 
 from recall.aios import PlaybackSliderAIO
-from recall.database import list_scan_timestamps
-from recall.database.connection import db
-from recall.database.models import Event
-from recall.database.queries import get_coords
+from recall.database.event_cache import get_event_summary
 from recall.layout import BASEMAP
-from recall.terracotta.client import get_singleband_url
-from recall.visuals import cmap2hex
+from recall.colormaps import product_colormap, load_hex
+from recall.terracotta.client import get_radar_url
 
 
 DEFAULT_COORDS = (64.0, 26.5)
+NATIONAL_ZOOM = 6
+RADAR_ZOOM = 8
 RADAR_LAYER_OPACITY = 0.8
+# number of frames kept loaded behind and ahead of the current one
+PREFETCH_BEHIND = int(os.environ.get('RECALL_PREFETCH_BEHIND', 2))
+PREFETCH_AHEAD = int(os.environ.get('RECALL_PREFETCH_AHEAD', 6))
+
+
+def radar_frames(timestamps, radar_name: str, product: str = 'DBZH'):
+    """Tile URLs and timestamp labels of the radar animation frames."""
+    return {
+        'urls': [get_radar_url(timestamp, radar_name, product) for timestamp in timestamps],
+        'labels': [timestamp.strftime('%Y-%m-%d %H:%M UTC') for timestamp in timestamps],
+        'behind': PREFETCH_BEHIND,
+        'ahead': PREFETCH_AHEAD,
+    }
 
 
 @callback(
     Output('map', 'children'),
-    Output('map-timestamp', 'children'),
+    Output('radar-frames', 'data'),
     Input('event-dropdown', 'value'),
+)
+def update_radar_layers(event_id: int):
+    """Set up the radar animation of the selected event.
+
+    The radar tile layers are managed on the client side, see below.
+    """
+    # the radar layer group is always present for the clientside callback
+    layers = list(BASEMAP) + [dl.LayerGroup(id='radar-layers')]
+    event = get_event_summary(event_id) if event_id else None
+    if not event:
+        return layers, {}
+    cmap = product_colormap('DBZH')
+    layers.append(dl.Colorbar(id='cbar', colorscale=load_hex(cmap), unit=cmap.unit,
+                              nTicks=5, width=20, height=250, min=cmap.vmin, max=cmap.vmax, position='topright'))
+    return layers, radar_frames(event.timestamps.tolist(), event.radar_name)
+
+
+# Only a window of frames around the current one is mounted, so that the
+# number of tile requests stays bounded regardless of the event length.
+# Layers stay mounted while they remain in the window as the window slides.
+clientside_callback(
+    """
+    function(frame, frames) {
+        const no_update = window.dash_clientside.no_update;
+        if (!frames || !frames.urls || !frames.urls.length) {
+            return [no_update, ''];
+        }
+        const n = frames.urls.length;
+        frame = Math.min(Math.max(frame || 0, 0), n - 1);
+        const first = Math.max(0, frame - frames.behind);
+        const last = Math.min(n - 1, frame + frames.ahead);
+        const layers = [];
+        for (let i = first; i <= last; i++) {
+            layers.push({
+                namespace: 'dash_leaflet',
+                type: 'TileLayer',
+                props: {
+                    id: {type: 'radar-layer', index: i},
+                    url: frames.urls[i],
+                    opacity: i === frame ? %s : 0.0
+                }
+            });
+        }
+        return [layers, frames.labels[frame]];
+    }
+    """ % RADAR_LAYER_OPACITY,
+    Output('radar-layers', 'children'),
+    Output('map-timestamp', 'children'),
     Input(PlaybackSliderAIO.ids.slider('playback'), 'value'),
+    Input('radar-frames', 'data'),
 )
-def update_radar_layers(event_id: int, slider_val: int):
-    """Update the radar image URL based on the selected event."""
-    cmap = 'gist_ncar'
-    layers = list(BASEMAP)
-    if not event_id:
-        return layers, ''
-    event = db.session.query(Event).get(event_id)
-    timestamps = list_scan_timestamps(event)
-    radar_name = event.radar.name
-    product = 'DBZH'
-    itimestep = slider_val
-    for i, timestamp in enumerate(timestamps):
-        url = get_singleband_url(timestamp, radar_name, product, colormap=cmap+'_cut', stretch_range='[0,255]')
-        opacity = RADAR_LAYER_OPACITY if i == itimestep else 0.0
-        layers.append(dl.TileLayer(id=f'scan{i}', url=url, opacity=opacity))
-    layers.append(dl.Colorbar(id='cbar', colorscale=cmap2hex(cmap),
-                              nTicks=5, width=20, height=250, min=-32, max=96, position='topright'))
-    return layers, timestamps[itimestep].strftime('%Y-%m-%d %H:%M UTC')
 
 
 @callback(
@@ -47,8 +92,7 @@ def update_radar_layers(event_id: int, slider_val: int):
 )
 def update_viewport(event_id: int):
     """Update the map viewport based on the selected event."""
-    if event_id:
-        event = db.session.query(Event).get(event_id)
-        lat, lon = get_coords(db, event.radar)
-        return dict(center=(lat, lon), zoom=8, transition='flyTo')
-    return dict(center=DEFAULT_COORDS, zoom=6, transition='flyTo')
+    event = get_event_summary(event_id) if event_id else None
+    if event:
+        return dict(center=event.coords, zoom=RADAR_ZOOM, transition='flyTo')
+    return dict(center=DEFAULT_COORDS, zoom=NATIONAL_ZOOM, transition='flyTo')
@@ -6,6 +6,7 @@ import dash_bootstrap_components as dbc
 
 from recall.database.connection import db
 from recall.database.models import Tag
+from recall.database.tag_cache import get_tags, invalidate_tags, match_tags
 
 
 @callback(
@@ -19,15 +20,18 @@ def populate_tag_collection(tag_name, signal, selected_tag_id):
     """Populate the tag collection.
 
     The tag collection holds all tags in the database.
-    The matching tags are highlighted.
+    The matching tags are highlighted. Tags are matched against the
+    in-process tag cache, so typing does not query the database.
     """
+    if ctx.triggered_id == 'tag-update-signal':
+        invalidate_tags()
+    tags = get_tags()
     matching_tags_ids = []
     full_match = False
     if tag_name:
-        matching_tags = db.session.query(Tag).filter(Tag.name.ilike(f'%{tag_name}%')).all()
+        matching_tags = match_tags(tags, tag_name)
         matching_tags_ids = [tag.id for tag in matching_tags]
         full_match = any(tag.name == tag_name for tag in matching_tags)
-    tags = db.session.query(Tag).order_by(Tag.name).all()
     tag_buttons = []
     # Disable the add button if the tag name is empty or tag_name already exists
     adding_disabled = not tag_name or full_match or selected_tag_id > -1
@@ -101,6 +105,7 @@ def add_tag(n_clicks, name, description):
     tag = Tag(name=name, description=description)
     db.session.add(tag)
     db.session.commit()
+    invalidate_tags()
     return 0, {'status': 'added', 'id': tag.id}
 
 
@@ -121,6 +126,7 @@ def save_tag(n_clicks, name, description, tag_id):
     tag.name = name
     tag.description = description
     db.session.commit()
+    invalidate_tags()
     return 0, {'status': 'updated'}
 
 
@@ -138,4 +144,5 @@ def delete_tag(n_clicks, tag_id):
     tag = db.session.query(Tag).get(tag_id)
     db.session.delete(tag)
     db.session.commit()
+    invalidate_tags()
     return 0, {'status': 'deleted'}
\ No newline at end of file
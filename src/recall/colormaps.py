@@ -0,0 +1,139 @@
+"""Registry of the radar product colormaps.
+
+Each colormap is built once from a matplotlib colormap into an RGBA lookup
+table (`<name>_v<version>_rgba.npy`, the format of terracotta extra
+colormaps) and a list of hex colors for the map colorbar
+(`<name>_v<version>_hex.json`). The artefacts are built at image build time,
+or on first use if missing, so matplotlib is needed only for building them.
+Bump COLORMAP_VERSION when a colormap changes, which also changes the tile
+URLs and thus invalidates cached tiles.
+
+This module depends on numpy only, so that the terracotta image can build
+the same artefacts with `python colormaps.py [directory]`.
+"""
+
+import os
+import sys
+import json
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+
+COLORMAP_VERSION = 1
+COLORMAP_DIR = os.environ.get('TC_EXTRA_CMAP_FOLDER', '/tmp/recall/colormaps')
+LUT_SIZE = 255  # terracotta colormaps map the stretch range to 255 colors
+
+
+class Colormap(NamedTuple):
+    name: str
+    cmap: str  # matplotlib colormap
+    offset: float  # physical value of geotiff value 0
+    gain: float  # physical value step per geotiff value
+    unit: str
+    cutoff: Optional[float] = None  # values below are transparent
+
+    @property
+    def versioned_name(self) -> str:
+        return f'{self.name}_v{COLORMAP_VERSION}'
+
+    @property
+    def vmin(self) -> float:
+        return self.offset
+
+    @property
+    def vmax(self) -> float:
+        return self.offset + self.gain*LUT_SIZE
+
+    def to_value(self, x: float) -> int:
+        """Convert a physical value to geotiff value."""
+        x = max(x, self.offset)
+        return min(int((x - self.offset)/self.gain), LUT_SIZE)
+
+
+REFLECTIVITY = Colormap('reflectivity', 'gist_ncar', offset=-32, gain=0.5, unit='dBZ', cutoff=-10)
+COLORMAPS = {cmap.name: cmap for cmap in (REFLECTIVITY,)}
+PRODUCT_COLORMAPS = {
+    'DBZH': REFLECTIVITY,
+    'DBZ-1': REFLECTIVITY,
+}
+
+
+def dbz2val(dbz: float) -> int:
+    """Convert a dbz to geotiff value."""
+    return REFLECTIVITY.to_value(dbz)
+
+
+def product_colormap(product: str) -> Colormap:
+    return PRODUCT_COLORMAPS[product.upper()]
+
+
+def lut_path(cmap: Colormap, directory: str = COLORMAP_DIR) -> str:
+    return os.path.join(directory, f'{cmap.versioned_name}_rgba.npy')
+
+
+def hex_path(cmap: Colormap, directory: str = COLORMAP_DIR) -> str:
+    return os.path.join(directory, f'{cmap.versioned_name}_hex.json')
+
+
+def build_lut(cmap: Colormap) -> np.ndarray:
+    """RGBA lookup table of a colormap with values below the cutoff transparent."""
+    import matplotlib
+    colors = matplotlib.colormaps[cmap.cmap](np.linspace(0, 1, LUT_SIZE))
+    lut = (colors*255).astype(np.uint8)
+    if cmap.cutoff is not None:
+        lut[:cmap.to_value(cmap.cutoff), 3] = 0
+    return lut
+
+
+def lut2hex(lut) -> List[str]:
+    """Convert an RGBA lookup table to a list of hex colors."""
+    return ['#%02x%02x%02x' % (r, g, b) for r, g, b, _ in lut]
+
+
+def build(cmap: Colormap, directory: str = COLORMAP_DIR):
+    """Write the lookup table and hex colors of a colormap."""
+    os.makedirs(directory, exist_ok=True)
+    lut = build_lut(cmap)
+    # write atomically, as processes may build concurrently on first use
+    tmp_path = os.path.join(directory, f'.{os.getpid()}_{cmap.versioned_name}')
+    np.save(tmp_path + '.npy', lut)
+    os.replace(tmp_path + '.npy', lut_path(cmap, directory))
+    with open(tmp_path, 'w') as f:
+        json.dump(lut2hex(lut), f)
+    os.replace(tmp_path, hex_path(cmap, directory))
+
+
+def build_all(directory: str = COLORMAP_DIR):
+    for cmap in COLORMAPS.values():
+        build(cmap, directory)
+        print(f'Built colormap {cmap.versioned_name} in {directory}')
+
+
+_luts = {}
+_hex = {}
+
+
+def load_lut(cmap: Colormap) -> np.ndarray:
+    """RGBA lookup table of a colormap, built if missing."""
+    if cmap.name not in _luts:
+        path = lut_path(cmap)
+        if not os.path.exists(path):
+            build(cmap)
+        _luts[cmap.name] = np.load(path)
+    return _luts[cmap.name]
+
+
+def load_hex(cmap: Colormap) -> List[str]:
+    """Hex colors of a colormap, built if missing."""
+    if cmap.name not in _hex:
+        path = hex_path(cmap)
+        if not os.path.exists(path):
+            build(cmap)
+        with open(path) as f:
+            _hex[cmap.name] = json.load(f)
+    return _hex[cmap.name]
+
+
+if __name__ == '__main__':
+    build_all(sys.argv[1] if len(sys.argv) > 1 else COLORMAP_DIR)
@@ -1,9 +1,16 @@
 import datetime
 
 
+SCAN_INTERVAL = datetime.timedelta(minutes=5)
+
+
 def list_scan_timestamps(event):
-    """List all radar scan timestamps in an event."""
+    """List the nominal radar scan timestamps in an event, end time included.
+
+    This is the regular grid of expected scans. See `recall.database.timeline`
+    for the scans actually available.
+    """
     start_time = event.start_time
     end_time = event.end_time
-    timestamps = [start_time + datetime.timedelta(minutes=5*i) for i in range(int((end_time - start_time).total_seconds() / 60 / 5))]
+    timestamps = [start_time + SCAN_INTERVAL*i for i in range(int((end_time - start_time) / SCAN_INTERVAL) + 1)]
     return timestamps
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""In-process cache of event summaries for the Events tab callbacks.
+
+Selecting an event and stepping through its frames only needs a handful of
+facts about the event, including its timeline. They are loaded once and cached, so that
+these callbacks do not touch the database. The cache keys include the shared
+versions of the event and of the ingest states, which are bumped when an
+event is written or ingested, so the caches of all processes are
+invalidated. Entries also expire after a TTL, in case the shared versions
+are unavailable.
+"""
+
+import os
+import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from recall import versions
+from recall.cache import TTLCache
+from recall.database.connection import db
+from recall.database.models import Event
+from recall.database.radars import radars
+from recall.database.timeline import event_timeline
+from recall.utils import timestamp_marks
+
+
+EVENT_CACHE_SIZE = int(os.environ.get('RECALL_EVENT_CACHE_SIZE', 256))
+EVENT_CACHE_TTL = float(os.environ.get('RECALL_EVENT_CACHE_TTL', 300))
+
+
+class EventSummary(NamedTuple):
+    id: int
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    description: Optional[str]
+    radar_id: int
+    radar_name: str
+    coords: Tuple[float, float]
+    tag_ids: List[int]
+    timestamps: np.ndarray  # datetime64 timeline
+    marks: dict
+
+
+_summaries = TTLCache(maxsize=EVENT_CACHE_SIZE, ttl=EVENT_CACHE_TTL)
+
+
+def load_event_summary(event_id: int) -> Optional[EventSummary]:
+    """Load an event summary from the database."""
+    event = db.session.get(Event, event_id)
+    if event is None:
+        return None
+    timestamps = event_timeline(event)
+    return EventSummary(
+        id=event.id,
+        start_time=event.start_time,
+        end_time=event.end_time,
+        description=event.description,
+        radar_id=event.radar.id,
+        radar_name=event.radar.name,
+        coords=radars.get(event.radar_id).coords,
+        tag_ids=[tag.id for tag in event.tags],
+        timestamps=timestamps,
+        marks=timestamp_marks(timestamps),
+    )
+
+
+def get_event_summary(event_id: int) -> Optional[EventSummary]:
+    """Get a cached event summary, loading it on a cache miss."""
+    key = (event_id, *versions.get_versions(versions.EVENTS, versions.event_key(event_id), versions.INGEST))
+    summary = _summaries.get(key)
+    if summary is None:
+        summary = load_event_summary(event_id)
+        if summary is not None:
+            _summaries.set(key, summary)
+    return summary
+
+
+def invalidate_events(event_ids):
+    """Invalidate the cached summaries of the given events in all processes."""
+    _summaries.invalidate()  # also locally, in case the shared versions are unavailable
+    versions.bump(*map(versions.event_key, event_ids))
+
+
+def invalidate_event(event_id: Optional[int] = None):
+    """Invalidate the cached summary of an event, or of all events if no id is given."""
+    if event_id is None:
+        _summaries.invalidate()  # also locally, in case the shared versions are unavailable
+        versions.bump(versions.EVENTS)
+    else:
+        invalidate_events([event_id])
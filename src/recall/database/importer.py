@@ -0,0 +1,241 @@
+"""Bulk import of events from toml, csv or json lines files.
+
+The toml format is the one written by the toml export: an array of `event`
+tables with keys radar, start_time, end_time, description and tags. Csv and
+json lines files have the same fields, one event per row, with csv tags
+separated by semicolons. Semicolons and backslashes in csv tag names are
+escaped with a backslash. Event ids in the input are ignored.
+
+Rows are loaded to temporary tables with COPY and validated and inserted as
+a whole with set-based queries. Events overlapping existing events, or an
+earlier starting event of the same radar in the same file, are skipped.
+Terracotta ingest of the imported events is queued as celery tasks.
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import datetime
+from typing import Iterable, List, NamedTuple
+
+try:
+    import tomllib
+except ImportError:  # python < 3.11
+    import tomli as tomllib
+import celery
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from recall.database.connection import db
+from recall.database.ingest_state import INGEST_CHUNK_SIZE
+from recall.database.queries import sqlstate, EXCLUSION_VIOLATION
+from recall.database.radars import radars
+from recall.database.tag_cache import invalidate_tags
+
+
+FORMATS = ('toml', 'csv', 'jsonl')
+FORMAT_EXTENSIONS = {'.toml': 'toml', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+TAG_SEPARATOR = ';'
+# tag names in a csv field, with escaped separators and backslashes
+TAG_NAME_PATTERN = re.compile(r'(?:\\.|[^\\%s])+' % re.escape(TAG_SEPARATOR))
+
+CREATE_IMPORT_TABLES = """
+CREATE TEMPORARY TABLE event_import (
+    n integer PRIMARY KEY,
+    radar_id integer NOT NULL,
+    start_time timestamp NOT NULL,
+    end_time timestamp NOT NULL,
+    description text,
+    skip boolean NOT NULL DEFAULT false
+) ON COMMIT DROP;
+CREATE TEMPORARY TABLE event_import_tag (
+    n integer NOT NULL,
+    tag_name varchar(255) NOT NULL
+) ON COMMIT DROP;
+"""
+
+# Skip rows overlapping an existing event, using the exclusion constraint's
+# gist index, or an earlier starting row of the same radar in the batch,
+# using a running maximum of the end times.
+MARK_OVERLAPS = """
+UPDATE event_import SET skip = true
+WHERE EXISTS (
+    SELECT 1 FROM event
+    WHERE event.radar_id = event_import.radar_id
+    AND event.span && tsrange(event_import.start_time, event_import.end_time, '[]')
+) OR n IN (
+    SELECT n FROM (
+        SELECT n, start_time <= max(end_time) OVER (
+            PARTITION BY radar_id ORDER BY start_time, n
+            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ) AS overlapping
+        FROM event_import
+    ) AS batch WHERE overlapping
+)
+"""
+
+INSERT_TAGS = """
+INSERT INTO tag (name)
+SELECT DISTINCT tag_name FROM event_import_tag
+WHERE tag_name NOT IN (SELECT name FROM tag)
+ON CONFLICT (name) DO NOTHING
+RETURNING name
+"""
+
+INSERT_EVENTS = """
+INSERT INTO event (radar_id, start_time, end_time, description)
+SELECT radar_id, start_time, end_time, description FROM event_import
+WHERE NOT skip ORDER BY n
+RETURNING id
+"""
+
+# The imported events overlap no other event of their radar, so they are
+# identified by radar and time span.
+INSERT_EVENT_TAGS = """
+INSERT INTO event_tag (event_id, tag_id)
+SELECT DISTINCT event.id, tag.id
+FROM event_import_tag
+JOIN event_import ON event_import.n = event_import_tag.n AND NOT event_import.skip
+JOIN event ON event.radar_id = event_import.radar_id
+    AND event.start_time = event_import.start_time
+    AND event.end_time = event_import.end_time
+JOIN tag ON tag.name = event_import_tag.tag_name
+"""
+
+
+class ImportResult(NamedTuple):
+    event_ids: List[int]
+    skipped: List[int]  # row numbers of overlapping rows
+    created_tags: List[str]
+
+
+def detect_format(filename: str) -> str:
+    """Input format from the file name extension."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in FORMAT_EXTENSIONS:
+        raise ValueError(f'Unknown event file format: {filename}')
+    return FORMAT_EXTENSIONS[ext]
+
+
+def read_events(content: str, fmt: str) -> Iterable[dict]:
+    """Read event records from the text content of an import file."""
+    if fmt == 'toml':
+        return tomllib.loads(content).get('event', [])
+    if fmt == 'csv':
+        return csv.DictReader(io.StringIO(content))
+    if fmt == 'jsonl':
+        return (json.loads(line) for line in content.splitlines() if line.strip())
+    raise ValueError(f'Unknown event file format: {fmt}')
+
+
+def parse_time(value) -> datetime.datetime:
+    """Naive UTC datetime from a datetime or an ISO 8601 string."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        raise ValueError(f'Invalid time: {value!r}')
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def join_tags(names) -> str:
+    """Join tag names to a csv field, escaping separators and backslashes in the names."""
+    return TAG_SEPARATOR.join(name.replace('\\', '\\\\').replace(TAG_SEPARATOR, '\\' + TAG_SEPARATOR)
+                              for name in names)
+
+
+def split_tags(value: str) -> List[str]:
+    """Split a csv field of tag names joined by `join_tags`."""
+    return [re.sub(r'\\(.)', r'\1', name) for name in TAG_NAME_PATTERN.findall(value)]
+
+
+def parse_tags(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = split_tags(value)
+    return [tag.strip() for tag in value if tag.strip()]
+
+
+def parse_record(n: int, record: dict):
+    """Validate an event record as an import row and its tag names."""
+    try:
+        radar = radars.by_name(record['radar'])
+        if radar is None:
+            raise ValueError(f'unknown radar {record["radar"]!r}')
+        start_time = parse_time(record['start_time'])
+        end_time = parse_time(record['end_time'])
+        if end_time < start_time:
+            raise ValueError('end time before start time')
+    except (KeyError, ValueError) as e:
+        raise ValueError(f'Invalid event on row {n}: {e}') from e
+    row = (n, radar.id, start_time.isoformat(), end_time.isoformat(), record.get('description') or None)
+    return row, parse_tags(record.get('tags'))
+
+
+def copy_rows(table: str, columns, rows):
+    """Load rows to a table with COPY."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    sql = f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+    cursor = db.session.connection().connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buf.seek(0)
+            cursor.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cursor.close()
+
+
+def import_events(records: Iterable[dict]) -> ImportResult:
+    """Import event records to the database in one transaction.
+
+    Unknown tags are created. Raises ValueError on invalid records, in which
+    case nothing is imported.
+    """
+    rows = []
+    event_tags = []
+    for n, record in enumerate(records, start=1):
+        row, tags = parse_record(n, record)
+        rows.append(row)
+        event_tags.extend((n, tag) for tag in tags)
+    if not rows:
+        return ImportResult([], [], [])
+    try:
+        db.session.execute(text(CREATE_IMPORT_TABLES))
+        copy_rows('event_import', ('n', 'radar_id', 'start_time', 'end_time', 'description'), rows)
+        copy_rows('event_import_tag', ('n', 'tag_name'), event_tags)
+        db.session.execute(text('ANALYZE event_import'))
+        db.session.execute(text(MARK_OVERLAPS))
+        skipped = db.session.scalars(text('SELECT n FROM event_import WHERE skip ORDER BY n')).all()
+        created_tags = db.session.scalars(text(INSERT_TAGS)).all()
+        event_ids = db.session.scalars(text(INSERT_EVENTS)).all()
+        db.session.execute(text(INSERT_EVENT_TAGS))
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if sqlstate(e) == EXCLUSION_VIOLATION:
+            raise ValueError('Events overlapping the imported events were added during the import, '
+                             'nothing was imported. Retry the import.') from e
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+    if created_tags:
+        invalidate_tags()
+    print(f'Imported {len(event_ids)} events, skipped {len(skipped)} overlapping events')
+    return ImportResult(list(event_ids), list(skipped), list(created_tags))
+
+
+def queue_ingest(event_ids: List[int], chunk_size: int = INGEST_CHUNK_SIZE) -> int:
+    """Queue terracotta ingest of events in chunks. Returns the number of tasks."""
+    chunks = [event_ids[i:i+chunk_size] for i in range(0, len(event_ids), chunk_size)]
+    for chunk in chunks:
+        celery.current_app.send_task('recall.ingest_events', args=(chunk,))
+    return len(chunks)
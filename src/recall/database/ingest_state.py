@@ -0,0 +1,144 @@
+"""Bookkeeping of ingested, missing and failed event timestamps.
+
+Ingested timestamps are final. A timestamp found missing is final only if it
+was recorded long enough after the scan time, as recent scans may still be
+uploaded and the bucket listings are cached. Other timestamps are retried.
+"""
+
+import os
+import datetime
+
+from sqlalchemy import and_, or_, func, event as sa_event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from recall.database import SCAN_INTERVAL, list_scan_timestamps
+from recall.database.connection import db
+from recall.database.models import Event, Radar, IngestState, utcnow
+from recall.terracotta.discovery import UPLOAD_DELAY, RECENT_MANIFEST_TTL
+
+
+INGESTED = 'ingested'
+MISSING = 'missing'
+FAILED = 'failed'
+# missing timestamps recorded within this time from the scan time are retried
+MISSING_GRACE = UPLOAD_DELAY + datetime.timedelta(seconds=RECENT_MANIFEST_TTL)
+# events per celery ingest task
+INGEST_CHUNK_SIZE = int(os.environ.get('RECALL_INGEST_CHUNK_SIZE', 10))
+
+# ingest states that are not retried
+is_done = or_(
+    IngestState.status == INGESTED,
+    and_(IngestState.status == MISSING, IngestState.updated_at >= IngestState.timestamp + MISSING_GRACE),
+)
+
+
+def load_states(event, product='DBZH'):
+    """Ingest statuses of the event's radar product timestamps by timestamp.
+
+    Missing timestamps that are still to be retried are left out.
+    """
+    if event.id is None:
+        return {}
+    rows = db.session.query(IngestState.timestamp, IngestState.status).filter(
+        IngestState.event_id == event.id,
+        IngestState.radar == event.radar.name,
+        IngestState.product == product,
+        IngestState.timestamp >= event.start_time,
+        IngestState.timestamp <= event.end_time,
+        or_(IngestState.status != MISSING, is_done),
+    )
+    return {timestamp: status for timestamp, status in rows}
+
+
+def pending_timestamps(event, product='DBZH', states=None):
+    """List the scan timestamps of an event that are yet to be ingested."""
+    if states is None:
+        states = load_states(event, product=product)
+    return [t for t in list_scan_timestamps(event) if states.get(t) not in (INGESTED, MISSING)]
+
+
+def count_ingested(event, product='DBZH') -> int:
+    """Number of the event's radar product timestamps recorded as ingested."""
+    return db.session.query(func.count(IngestState.timestamp)).filter(
+        IngestState.event_id == event.id,
+        IngestState.radar == event.radar.name,
+        IngestState.product == product,
+        IngestState.status == INGESTED,
+    ).scalar()
+
+
+def record_states(event, states, product='DBZH'):
+    """Insert or update the ingest statuses given as a timestamp: status mapping.
+
+    The changes are flushed, but committing is left to the caller.
+    """
+    if not states:
+        return
+    values = [dict(event_id=event.id, radar=event.radar.name, product=product, timestamp=timestamp, status=status,
+                   updated_at=utcnow)
+              for timestamp, status in states.items()]
+    stmt = insert(IngestState).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IngestState.event_id, IngestState.radar, IngestState.product, IngestState.timestamp],
+        set_=dict(status=stmt.excluded.status, updated_at=stmt.excluded.updated_at),
+    )
+    db.session.execute(stmt)
+    db.session.flush()
+
+
+def on_commit(fun, *args):
+    """Call `fun` once the current transaction of the session is committed.
+
+    The call is dropped if the transaction is rolled back instead.
+    """
+    db.session().info.setdefault('on_commit', []).append((fun, args))
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _run_on_commit(session):
+    for fun, args in session.info.pop('on_commit', ()):
+        fun(*args)
+
+
+@sa_event.listens_for(Session, 'after_soft_rollback')
+def _drop_on_commit(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('on_commit', None)
+
+
+def recently_ingested(max_age: datetime.timedelta, limit: int, product='DBZH'):
+    """List (timestamp, radar) pairs ingested within `max_age`, most recent first."""
+    rows = db.session.query(IngestState.timestamp, IngestState.radar).filter(
+        IngestState.product == product,
+        IngestState.status == INGESTED,
+        IngestState.updated_at >= utcnow - max_age,
+    ).order_by(IngestState.updated_at.desc(), IngestState.timestamp.desc()).limit(limit)
+    return [(timestamp, radar) for timestamp, radar in rows]
+
+
+def pending_event_ids(product='DBZH'):
+    """List the ids of events that have timestamps yet to be ingested.
+
+    The done timestamps of all events are counted and compared to the number
+    of nominal scan timestamps in a single query.
+    """
+    n_done = func.count(IngestState.timestamp)
+    n_scans = func.floor(func.extract('epoch', Event.end_time - Event.start_time)/SCAN_INTERVAL.total_seconds()) + 1
+    state_match = and_(
+        IngestState.event_id == Event.id,
+        IngestState.radar == Radar.name,
+        IngestState.product == product,
+        is_done,
+        IngestState.timestamp >= Event.start_time,
+        IngestState.timestamp <= Event.end_time,
+    )
+    query = (
+        db.session.query(Event.id)
+        .join(Radar, Event.radar_id == Radar.id)
+        .outerjoin(IngestState, state_match)
+        .group_by(Event.id)
+        .having(n_done < n_scans)
+        .order_by(Event.start_time)
+    )
+    return [event_id for event_id, in query]
@@ -1,17 +1,22 @@
 from typing import List, Optional
 import datetime
 
-from sqlalchemy import Column, String, Text, ForeignKey, event
+from sqlalchemy import Column, Computed, Integer, String, Text, ForeignKey, Index, event, func
+from sqlalchemy.dialects.postgresql import TSRANGE, ExcludeConstraint
 from sqlalchemy.orm import mapped_column, Mapped
 from geoalchemy2 import Geography
 
 from recall.database.connection import db
 
 
+# current time as naive UTC, like all timestamps in the database
+utcnow = func.timezone('UTC', func.now())
+
 event_tag_m2m = db.Table(
     'event_tag',
     Column('event_id', ForeignKey('event.id'), primary_key=True),
     Column('tag_id', ForeignKey('tag.id'), primary_key=True),
+    Index('ix_event_tag_tag_id_event_id', 'tag_id', 'event_id'),
 )
 
 tag_tag_m2m = db.Table(
@@ -20,6 +25,15 @@ tag_tag_m2m = db.Table(
     Column('child_tag_id', ForeignKey('tag.id'), primary_key=True),
 )
 
+# Transitive closure of the tag hierarchy, including each tag itself at depth 0.
+# Maintained by database triggers on tag and tag_tag, created by the migrations.
+tag_closure = db.Table(
+    'tag_closure',
+    Column('ancestor_id', ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    Column('descendant_id', ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True, index=True),
+    Column('depth', Integer, nullable=False),
+)
+
 
 class Radar(db.Model):
     __tablename__ = 'radar'
@@ -33,17 +47,51 @@ class Radar(db.Model):
 
 class Event(db.Model):
     __tablename__ = 'event'
+    __table_args__ = (
+        Index('ix_event_start_time_id', 'start_time', 'id'),  # keyset pagination
+        # substring search on descriptions
+        Index('ix_event_description_trgm', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}),
+        # events of the same radar may not overlap
+        ExcludeConstraint(('radar_id', '='), ('span', '&&'), using='gist', name='event_no_overlap'),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     radar_id: Mapped[int] = mapped_column(ForeignKey('radar.id'))
     start_time: Mapped[datetime.datetime]
     end_time: Mapped[datetime.datetime]
     description = Column(Text)
+    span = Column(TSRANGE, Computed("tsrange(start_time, end_time, '[]')", persisted=True))
     radar: Mapped['Radar'] = db.relationship(back_populates="events")
     tags: Mapped[List['Tag']] = db.relationship(secondary=event_tag_m2m, back_populates="events")
+    ingest_states: Mapped[List['IngestState']] = db.relationship(
+        back_populates="event", cascade='all, delete-orphan', passive_deletes=True
+    )
+
+
+class IngestState(db.Model):
+    """Ingest status of a radar product timestamp of an event.
+
+    The status is one of 'ingested', 'missing' or 'failed'.
+    """
+    __tablename__ = 'ingest_state'
+    __table_args__ = (
+        Index('ix_ingest_state_updated_at', 'updated_at'),  # recently ingested datasets
+    )
+    event_id: Mapped[int] = mapped_column(ForeignKey('event.id', ondelete='CASCADE'), primary_key=True)
+    radar: Mapped[str] = mapped_column(String(10), primary_key=True)
+    product: Mapped[str] = mapped_column(String(10), primary_key=True)
+    timestamp: Mapped[datetime.datetime] = mapped_column(primary_key=True)
+    status: Mapped[str] = mapped_column(String(10))
+    updated_at: Mapped[datetime.datetime] = mapped_column(server_default=utcnow, onupdate=utcnow)
+    event: Mapped['Event'] = db.relationship(back_populates="ingest_states")
 
 
 class Tag(db.Model):
     __tablename__ = 'tag'
+    __table_args__ = (
+        # substring search on tag names
+        Index('ix_tag_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), unique=True)
     description: Mapped[str] = Column(Text)
@@ -92,4 +140,4 @@ def insert_basic_tags(*args, **kws):
         Tag(name='melting', description='Melting layer signature.')
     ]
     for tag in tags:
-        db.session.add(tag)
\ No newline at end of file
+        db.session.add(tag)
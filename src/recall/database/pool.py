@@ -0,0 +1,119 @@
+"""Database connection pool configuration shared by the app and terracotta engines.
+
+The web workers, the celery worker and the terracotta server share one
+Postgres, so each process keeps a bounded pool of connections. The pools are
+fork safe: connections inherited from a parent process are never used by the
+child, which matters for the celery prefork pool and preloaded gunicorn
+workers. The time spent waiting for a connection from a pool, including the
+connect time of new connections, is recorded per pool.
+
+Pool settings are read from environment variables with a prefix, e.g.
+RECALL_DB_POOL_SIZE for the app database and RECALL_TC_DB_POOL_SIZE for the
+terracotta database.
+"""
+
+import os
+import time
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+# slower checkouts are logged
+POOL_WAIT_WARN = float(os.environ.get('RECALL_DB_POOL_WAIT_WARN', 0.5))  # seconds
+
+
+class PoolStats:
+    """Checkout wait time statistics of a connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.__init__()
+
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if wait > POOL_WAIT_WARN:
+                self.slow += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(
+                checkouts=self.checkouts,
+                wait_mean=self.wait_total/self.checkouts if self.checkouts else 0.0,
+                wait_max=self.wait_max,
+                slow=self.slow,
+            )
+
+
+_stats = {}
+
+
+def _reset_stats():
+    for stats in _stats.values():
+        stats.reset()
+
+
+# statistics are per process
+os.register_at_fork(after_in_child=_reset_stats)
+
+
+def pool_stats() -> dict:
+    """Checkout wait time statistics of the pools of this process by pool name."""
+    return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+def _record_pid(dbapi_connection, connection_record):
+    connection_record.info['pid'] = os.getpid()
+
+
+class TimedQueuePool(QueuePool):
+    """Fork safe queue pool recording the checkout wait times."""
+
+    pool_name = 'default'
+
+    def __init__(self, *args, **kws):
+        super().__init__(*args, **kws)
+        self.stats = _stats.setdefault(self.pool_name, PoolStats())
+        event.listen(self, 'connect', _record_pid)
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            record = super()._do_get()
+            if record.dbapi_connection is not None and record.info.get('pid') != os.getpid():
+                # inherited from the parent process: reconnect, leaving the
+                # parent's connection open, before it is pinged or used
+                record.dbapi_connection = None
+            return record
+        finally:
+            wait = time.perf_counter() - t0
+            self.stats.record(wait)
+            if wait > POOL_WAIT_WARN:
+                print(f'Waited {wait:.2f} s for a {self.pool_name} database connection '
+                      f'({self.checkedout()} checked out of {self.size()}+{self._max_overflow})')
+
+
+def engine_options(name: str, prefix: str, pool_size: int = 5, max_overflow: int = 10) -> dict:
+    """Engine options of a named, fork safe and timed connection pool.
+
+    The defaults can be overridden with <prefix>_POOL_SIZE, <prefix>_MAX_OVERFLOW,
+    <prefix>_POOL_TIMEOUT and <prefix>_POOL_RECYCLE environment variables.
+    """
+    return dict(
+        poolclass=type('TimedQueuePool', (TimedQueuePool,), {'pool_name': name}),
+        pool_size=int(os.environ.get(f'{prefix}_POOL_SIZE', pool_size)),
+        max_overflow=int(os.environ.get(f'{prefix}_MAX_OVERFLOW', max_overflow)),
+        pool_timeout=float(os.environ.get(f'{prefix}_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.environ.get(f'{prefix}_POOL_RECYCLE', 1800)),  # seconds
+        pool_pre_ping=True,
+    )
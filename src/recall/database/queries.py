@@ -1,22 +1,33 @@
 """Methods for interacting with the database."""
 
+import os
 import datetime
 
-from sqlalchemy import or_, and_
+from sqlalchemy import and_, or_, func, literal_column, select, tuple_, text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from recall.database.connection import db
-from recall.terracotta.ingest import insert_event
-from recall.database.models import Event, Radar, Tag
+from recall.database.models import Event, Radar, Tag, event_tag_m2m, tag_closure
 
 
-def get_coords(db, radar):
-    lat = db.session.scalar(radar.location.ST_Y())
-    lon = db.session.scalar(radar.location.ST_X())
-    return lat, lon
+EVENT_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 1000
+# SQLSTATE of exclusion constraint violations
+EXCLUSION_VIOLATION = '23P01'
+MIGRATIONS_DIR = os.environ.get('RECALL_MIGRATIONS_DIR', 'migrations')
+# advisory lock serializing the database setup of concurrently starting processes
+SETUP_LOCK_ID = 0x7eca11
+
+_migrated = False
 
 
 def add_event(db, radar, start_time, end_time, description, tags=None, **kws):
-    """Add an event to the database."""
+    """Add an event to the database.
+
+    Raises ValueError if the event overlaps with an existing event.
+    """
+    from recall.terracotta.ingest import insert_event
     event = Event(
         radar=radar,
         tags=tags,
@@ -24,24 +35,38 @@ def add_event(db, radar, start_time, end_time, description, tags=None, **kws):
         end_time=end_time,
         description=description
     )
-    if event_overlaps_existing(db, event):
-        raise ValueError('Event overlaps with existing event')
-    insert_event(event, **kws)
     db.session.add(event)
+    flush_event(db)
+    insert_event(event, **kws)
     db.session.commit()
     return event
 
 
-def event_overlaps_existing(db, event):
-    """Check if the event overlaps with any existing events."""
-    filter_radar = Event.radar == event.radar
-    filter_separate = Event.id != event.id
-    filter_overlap = or_(
-        and_(Event.start_time <= event.start_time, event.start_time <= Event.end_time),
-        and_(Event.start_time <= event.end_time, event.end_time <= Event.end_time)
-    )
-    events = db.session.query(Event).filter(filter_radar, filter_separate, filter_overlap).all()
-    return len(events) > 0
+def sqlstate(e) -> str:
+    """SQLSTATE code of a database error."""
+    # sqlstate with psycopg 3, pgcode with psycopg2
+    return getattr(e.orig, 'sqlstate', None) or getattr(e.orig, 'pgcode', None)
+
+
+def flush_event(db):
+    """Flush pending event changes to the database.
+
+    Overlapping events of the same radar are rejected by the exclusion
+    constraint on the event time span, which is race-free also under
+    concurrent submissions. Events ending before they start are rejected
+    when the time span is computed. In both cases, the session is rolled
+    back and ValueError is raised.
+    """
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        db.session.rollback()
+        if sqlstate(e) == EXCLUSION_VIOLATION:
+            raise ValueError('Event overlaps with existing event') from e
+        raise
+    except DataError as e:
+        db.session.rollback()
+        raise ValueError('Event ends before it starts') from e
 
 
 def sample_events(db):
@@ -62,26 +87,169 @@ def sample_events(db):
     return events
 
 
+def upgrade_db(server):
+    """Apply the Alembic migrations, which also create the tag closure triggers.
+
+    The migrations are idempotent, so that they can be applied to tables
+    created by db.create_all.
+    """
+    from alembic import command
+    from flask_migrate import Migrate
+    if 'migrate' not in server.extensions:
+        Migrate(server, db, directory=MIGRATIONS_DIR)
+    command.upgrade(server.extensions['migrate'].migrate.get_config(MIGRATIONS_DIR), 'head')
+
+
 def initial_db_setup(db, server):
+    global _migrated
     print('Setting up database')
     with server.app_context():
-        db.create_all()
-        db.session.commit()
+        with db.engine.connect() as lock:
+            lock.execute(text('SELECT pg_advisory_lock(:id)'), {'id': SETUP_LOCK_ID})
+            try:
+                # required by the event overlap exclusion constraint and the tag name index
+                db.session.execute(text('CREATE EXTENSION IF NOT EXISTS btree_gist'))
+                db.session.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+                db.session.commit()
+                db.create_all()
+                db.session.commit()
+                if not _migrated:
+                    upgrade_db(server)
+                    _migrated = True
+            finally:
+                lock.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': SETUP_LOCK_ID})
         sample_events(db)
 
 
+def event_rows():
+    """Query events with their radar name and tag names in a single query.
+
+    The rows have attributes id, radar, start_time, end_time, description and
+    tags, where radar is the radar name and tags is a list of tag names.
+    """
+    tag_names = func.array_agg(aggregate_order_by(Tag.name, Tag.name)).filter(Tag.name.isnot(None))
+    return (
+        db.session.query(
+            Event.id,
+            Radar.name.label('radar'),
+            Event.start_time,
+            Event.end_time,
+            Event.description,
+            func.coalesce(tag_names, literal_column("'{}'::varchar[]")).label('tags'),
+        )
+        .join(Radar, Event.radar_id == Radar.id)
+        .outerjoin(event_tag_m2m, event_tag_m2m.c.event_id == Event.id)
+        .outerjoin(Tag, Tag.id == event_tag_m2m.c.tag_id)
+        .group_by(Event.id, Radar.name)
+        .order_by(Event.start_time, Event.id)
+    )
+
+
+def event_label(row):
+    """Dropdown label of an event: start date, radar name and tags."""
+    label = f"{row.start_time.strftime('%Y-%m-%d')} {row.radar}"
+    if row.tags:
+        label += f": {', '.join(row.tags)}"
+    return label
+
+
 def events_list():
     """Generate a list of dictionaries containing event information."""
-    events = db.session.query(Event).order_by(Event.start_time).all()
-    event_list = []
-    for event in events:
-        e = {
-            'id': event.id,
-            'radar': event.radar.name,
-            'start_time': event.start_time,
-            'end_time': event.end_time,
-            'description': event.description,
-            'tags': [tag.name for tag in event.tags]
-        }
-        event_list.append(e)
-    return event_list
+    return [row._asdict() for row in event_rows()]
+
+
+def tagged_with(tag_ids):
+    """Filter condition matching events tagged with any of the tags or their descendants."""
+    tagged = (
+        select(event_tag_m2m.c.event_id)
+        .join(tag_closure, tag_closure.c.descendant_id == event_tag_m2m.c.tag_id)
+        .where(tag_closure.c.ancestor_id.in_(tag_ids))
+    )
+    return Event.id.in_(tagged)
+
+
+def escape_like(value: str, escape: str = '\\') -> str:
+    """Escape the LIKE wildcards and the escape character in a string."""
+    for char in (escape, '%', '_'):
+        value = value.replace(char, escape + char)
+    return value
+
+
+def date_range(search: str):
+    """Parse a YYYY, YYYY-MM or YYYY-MM-DD date into a [start, end) range.
+
+    Returns None if the string is not such a date.
+    """
+    for fmt, step in (('%Y-%m-%d', 'day'), ('%Y-%m', 'month'), ('%Y', 'year')):
+        try:
+            start = datetime.datetime.strptime(search, fmt)
+        except ValueError:
+            continue
+        if step == 'day':
+            return start, start + datetime.timedelta(days=1)
+        if step == 'month':
+            return start, (start + datetime.timedelta(days=32)).replace(day=1)
+        return start, start.replace(year=start.year + 1)
+    return None
+
+
+def search_events(search=None, after=None, limit=EVENT_PAGE_SIZE, tag_ids=None):
+    """Search events a page at a time.
+
+    Events match if the search string is found in the radar name, description
+    or any tag name, or if it is a date (YYYY, YYYY-MM or YYYY-MM-DD) that the
+    event starts within. The description and tag names are searched using
+    trigram indexes. If `tag_ids` are given, only events tagged with any of
+    them or their descendant tags match. Pages are ordered by
+    (start_time, id) and `after` is the (start_time, id) of the last event of
+    the previous page.
+
+    Returns the rows of the page and the cursor of the next page, which is
+    None on the last page.
+    """
+    query = event_rows()
+    search = search.strip() if search else None
+    if search:
+        pattern = f'%{escape_like(search)}%'
+        tagged = (
+            select(event_tag_m2m.c.event_id)
+            .join(Tag, Tag.id == event_tag_m2m.c.tag_id)
+            .where(Tag.name.ilike(pattern, escape='\\'))
+        )
+        conditions = [
+            Radar.name.ilike(pattern, escape='\\'),
+            Event.description.ilike(pattern, escape='\\'),
+            Event.id.in_(tagged),
+        ]
+        dates = date_range(search)
+        if dates:
+            conditions.append(and_(Event.start_time >= dates[0], Event.start_time < dates[1]))
+        query = query.filter(or_(*conditions))
+    if tag_ids:
+        query = query.filter(tagged_with(tag_ids))
+    if after:
+        query = query.filter(tuple_(Event.start_time, Event.id) > tuple_(*after))
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1].start_time, rows[-1].id)
+    return rows, None
+
+
+def export_rows(radar_names=None, tag_ids=None, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Query events for export, streamed from the database in chunks.
+
+    Events can be filtered by radar names, by tags including their descendant
+    tags, and by overlap with the time range from `start` to `end`. An empty
+    list of tag ids matches no events.
+    """
+    query = event_rows()
+    if radar_names:
+        query = query.filter(Radar.name.in_(radar_names))
+    if tag_ids is not None:
+        query = query.filter(tagged_with(tag_ids))
+    if start:
+        query = query.filter(Event.end_time >= start)
+    if end:
+        query = query.filter(Event.start_time <= end)
+    return query.yield_per(chunk_size)
@@ -0,0 +1,97 @@
+"""In-process registry of the radar sites.
+
+The radar set is small and practically static, so it is loaded once per
+process and served from memory. Call `radars.refresh()` after changing the
+radar table. Radars added by other processes are loaded on the first lookup
+missing them.
+"""
+
+import os
+import math
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+
+from recall.database.connection import db
+from recall.database.models import Radar
+
+
+RADAR_RANGE_KM = float(os.environ.get('RECALL_RADAR_RANGE_KM', 250))
+EARTH_RADIUS_KM = 6371.0
+
+
+class RadarInfo(NamedTuple):
+    id: int
+    name: str
+    fmisid: int
+    lat: float
+    lon: float
+    description: Optional[str]
+    range_km: float = RADAR_RANGE_KM
+
+    @property
+    def coords(self) -> Tuple[float, float]:
+        return self.lat, self.lon
+
+    def distance_km(self, lat: float, lon: float) -> float:
+        """Great circle distance from the radar to a location."""
+        phi1, phi2 = math.radians(self.lat), math.radians(lat)
+        dphi = phi2 - phi1
+        dlambda = math.radians(lon - self.lon)
+        a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
+        return 2*EARTH_RADIUS_KM*math.asin(math.sqrt(a))
+
+
+class RadarRegistry:
+    """Radar sites loaded once from the database with a single query."""
+
+    def __init__(self):
+        self._radars = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reload the radars from the database."""
+        rows = db.session.query(
+            Radar.id, Radar.name, Radar.fmisid,
+            func.ST_Y(Radar.location), func.ST_X(Radar.location),
+            Radar.description,
+        ).order_by(Radar.name)
+        radars = {row[0]: RadarInfo(*row) for row in rows}
+        with self._lock:
+            self._radars = radars
+
+    def _loaded(self):
+        # an empty table is not cached, as radars are inserted on initial setup
+        if not self._radars:
+            self.refresh()
+        return self._radars
+
+    def all(self) -> List[RadarInfo]:
+        """All radars ordered by name."""
+        return list(self._loaded().values())
+
+    def get(self, radar_id: int) -> Optional[RadarInfo]:
+        radar = self._loaded().get(radar_id)
+        if radar is None:  # added after loading, or unknown
+            self.refresh()
+            radar = self._radars.get(radar_id)
+        return radar
+
+    def by_name(self, name: str) -> Optional[RadarInfo]:
+        radar = self._find(name)
+        if radar is None:
+            self.refresh()
+            radar = self._find(name)
+        return radar
+
+    def _find(self, name: str) -> Optional[RadarInfo]:
+        return next((radar for radar in self._loaded().values() if radar.name == name), None)
+
+    def covering(self, lat: float, lon: float) -> List[RadarInfo]:
+        """Radars whose range covers a location, nearest first."""
+        distances = [(radar.distance_km(lat, lon), radar) for radar in self._loaded().values()]
+        return [radar for distance, radar in sorted(distances) if distance <= radar.range_km]
+
+
+radars = RadarRegistry()
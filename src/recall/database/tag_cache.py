@@ -0,0 +1,48 @@
+"""In-process cache of the tag list for the tag callbacks.
+
+The tag collection is filtered on every keystroke, so the tags are loaded
+once and matched in memory. The cache is invalidated on tag writes and
+expires after a TTL to bound staleness across processes.
+"""
+
+import os
+from typing import List, NamedTuple, Optional
+
+from recall.cache import TTLCache
+from recall.database.connection import db
+from recall.database.models import Tag
+
+
+TAG_CACHE_TTL = float(os.environ.get('RECALL_TAG_CACHE_TTL', 300))
+
+
+class TagSummary(NamedTuple):
+    id: int
+    name: str
+    description: Optional[str]
+
+
+_tags = TTLCache(maxsize=1, ttl=TAG_CACHE_TTL)
+
+
+def load_tags() -> List[TagSummary]:
+    """Load all tags ordered by name."""
+    rows = db.session.query(Tag.id, Tag.name, Tag.description).order_by(Tag.name)
+    return [TagSummary(*row) for row in rows]
+
+
+def get_tags() -> List[TagSummary]:
+    """Get the cached tags ordered by name."""
+    return _tags.get_or_set('tags', load_tags)
+
+
+def invalidate_tags():
+    """Forget the cached tags."""
+    _tags.invalidate()
+
+
+def match_tags(tags, term: str) -> List[TagSummary]:
+    """Tags whose name contains the term, ignoring case."""
+    term = term.lower()
+    return [tag for tag in tags if term in tag.name.lower()]
+
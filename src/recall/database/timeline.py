@@ -0,0 +1,59 @@
+"""Event timelines built from the radar scans actually ingested.
+
+A timeline is a sorted NumPy datetime64 array of the event's frames, shared
+by the playback slider, the map layers and the animation export. It is built
+from the timestamps recorded as ingested, which in turn are planned from the
+files found on S3, so gaps and irregular scan cadences are reflected as they
+are. Events not yet ingested fall back to the nominal scan grid. Cached
+timelines are keyed on the shared ingest state version, so ingest in any
+process invalidates them everywhere.
+"""
+
+import os
+
+import numpy as np
+
+from recall import versions
+from recall.cache import TTLCache
+from recall.database import list_scan_timestamps
+from recall.database.connection import db
+from recall.database.models import IngestState
+
+
+TIMELINE_CACHE_SIZE = int(os.environ.get('RECALL_TIMELINE_CACHE_SIZE', 256))
+TIMELINE_CACHE_TTL = float(os.environ.get('RECALL_TIMELINE_CACHE_TTL', 60))
+TIMELINE_DTYPE = 'datetime64[m]'
+
+_timelines = TTLCache(maxsize=TIMELINE_CACHE_SIZE, ttl=TIMELINE_CACHE_TTL)
+
+
+def load_timeline(event, product: str = 'DBZH') -> np.ndarray:
+    """Load the timeline of an event from the ingest state table."""
+    rows = db.session.query(IngestState.timestamp).filter(
+        IngestState.event_id == event.id,
+        IngestState.radar == event.radar.name,
+        IngestState.product == product,
+        IngestState.status == 'ingested',
+        IngestState.timestamp >= event.start_time,
+        IngestState.timestamp <= event.end_time,
+    ).order_by(IngestState.timestamp)
+    timestamps = [timestamp for timestamp, in rows]
+    if not timestamps:
+        timestamps = list_scan_timestamps(event)
+    return np.array(timestamps, dtype=TIMELINE_DTYPE)
+
+
+def event_timeline(event, product: str = 'DBZH') -> np.ndarray:
+    """Cached timeline of an event.
+
+    Use `timeline.tolist()` to get the timestamps as datetime objects.
+    """
+    key = (event.id, event.radar.name, event.start_time, event.end_time, product,
+           *versions.get_versions(versions.INGEST))
+    return _timelines.get_or_set(key, load_timeline, event, product=product)
+
+
+def invalidate_timelines():
+    """Invalidate the cached timelines in all processes."""
+    _timelines.invalidate()
+    versions.bump(versions.INGEST)
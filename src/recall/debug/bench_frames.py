@@ -0,0 +1,62 @@
+"""Measure the per-frame callback payload and latency of radar animation.
+
+Compares rebuilding the whole map layer stack on the server for every frame,
+as done originally, with the clientside windowed layer manager, which only
+receives the frame URLs once per event selection and mounts a bounded window
+of layers around the current frame.
+"""
+import time
+import json
+import datetime
+
+from dash._utils import to_json
+import dash_leaflet as dl
+
+from recall.callbacks.map import radar_frames, RADAR_LAYER_OPACITY
+from recall.layout import BASEMAP
+
+
+EVENT_LENGTHS = (12, 288, 864)  # frames
+
+
+def rebuild_layers(frames, frame):
+    """Server side payload of one frame when rebuilding all layers."""
+    layers = list(BASEMAP)
+    for i, url in enumerate(frames['urls']):
+        opacity = RADAR_LAYER_OPACITY if i == frame else 0.0
+        layers.append(dl.TileLayer(id=f'scan{i}', url=url, opacity=opacity))
+    return to_json({'map': {'children': layers}, 'map-timestamp': {'children': frames['labels'][frame]}})
+
+
+def window_layers(frames, frame):
+    """Clientside payload of one frame with the windowed layer manager."""
+    first = max(0, frame - frames['behind'])
+    last = min(len(frames['urls']) - 1, frame + frames['ahead'])
+    layers = [
+        {'namespace': 'dash_leaflet', 'type': 'TileLayer',
+         'props': {'id': {'type': 'radar-layer', 'index': i}, 'url': frames['urls'][i],
+                   'opacity': RADAR_LAYER_OPACITY if i == frame else 0.0}}
+        for i in range(first, last+1)
+    ]
+    return json.dumps([layers, frames['labels'][frame]])
+
+
+def bench(fun, frames, frame):
+    t0 = time.perf_counter()
+    payload = fun(frames, frame)
+    return len(payload.encode()), time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+    print('Per-frame payload in bytes and build time in ms')
+    print(f'{"frames":>7} {"rebuild B":>10} {"rebuild ms":>11} {"window B":>9} {"window ms":>10} {"selection B":>12}')
+    for n in EVENT_LENGTHS:
+        timestamps = [datetime.datetime(2023, 8, 28) + datetime.timedelta(minutes=5*i) for i in range(n)]
+        frames = radar_frames(timestamps, 'fikor')
+        frame = n//2
+        rebuild_bytes, rebuild_t = bench(rebuild_layers, frames, frame)
+        window_bytes, window_t = bench(window_layers, frames, frame)
+        selection_bytes = len(to_json(frames).encode())
+        print(f'{n:>7} {rebuild_bytes:>10} {rebuild_t*1e3:>11.2f} {window_bytes:>9} {window_t*1e3:>10.3f} {selection_bytes:>12}')
+    print('Window payloads are produced in the browser, with no server round-trip.')
+    print('The selection payload is sent once per event selection.')
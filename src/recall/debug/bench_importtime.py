@@ -0,0 +1,48 @@
+"""Check the import time of the web app against a budget.
+
+Imports recall.app in fresh interpreters with `python -X importtime`, reports
+the cumulative import times of the largest packages, and checks that the
+median total stays within the budget and that the heavy ingest and
+rendering dependencies are not imported by the web process.
+
+Usage: python bench_importtime.py [module]
+"""
+import os
+import sys
+import statistics
+import subprocess
+
+
+BUDGET = float(os.environ.get('RECALL_BENCH_IMPORT_BUDGET', 2.5))  # seconds
+RUNS = int(os.environ.get('RECALL_BENCH_IMPORT_RUNS', 5))
+# imported only by the code paths that ingest, render or export parquet
+FORBIDDEN = ('matplotlib', 'terracotta', 'rasterio', 'boto3', 'botocore', 'PIL', 'pyarrow', 'flask_migrate')
+N_TOP = 15
+
+
+def importtime(module):
+    """Cumulative import times in seconds of the packages imported by a module."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name.strip()
+        times[name] = max(times.get(name, 0), int(cumulative)/1e6)
+    return times
+
+
+if __name__ == '__main__':
+    module = sys.argv[1] if len(sys.argv) > 1 else 'recall.app'
+    importtime(module)  # warm up the bytecode cache
+    runs = [importtime(module) for _ in range(RUNS)]
+    total = statistics.median(run[module] for run in runs)
+    top = sorted(((t, name) for name, t in runs[-1].items() if '.' not in name and name != module), reverse=True)
+    print(f'{module}: {total*1e3:.0f} ms (median of {RUNS})')
+    for t, name in top[:N_TOP]:
+        print(f'{t*1e3:>8.0f} ms  {name}')
+    imported = sorted(name for name in FORBIDDEN if name in runs[-1])
+    assert not imported, f'{module} imports {", ".join(imported)}'
+    assert total < BUDGET, f'{module} import took {total:.2f} s > {BUDGET} s'
@@ -0,0 +1,59 @@
+"""Benchmark the per-timestamp cost of skipping already ingested datasets.
+
+A temporary SQLite terracotta catalogue is filled with dummy datasets, and the
+cost of checking one event worth of timestamps is measured as the catalogue
+grows, both with an `IngestSession` key snapshot and with the former approach
+of listing the whole catalogue for each timestamp.
+"""
+import os
+import time
+import datetime
+import tempfile
+
+import terracotta as tc
+
+from recall.terracotta.ingest import IngestSession, KEYS, dataset_keys
+
+
+RADARS = ('fikor', 'fivih', 'fivim', 'fiuta', 'filuo', 'finur', 'fikuo', 'fikes', 'fikan', 'fipet', 'fianj')
+EVENT_TIMESTAMPS = 288
+CATALOGUE_SIZES = (1000, 10000, 50000)
+
+
+def fill_catalogue(driver, n, start=datetime.datetime(2020, 1, 1)):
+    """Insert n dummy datasets without computing raster metadata."""
+    with driver.connect():
+        for i in range(n):
+            timestamp = start + datetime.timedelta(minutes=5*(i//len(RADARS)))
+            keys = dataset_keys(timestamp, RADARS[i % len(RADARS)], 'DBZH')
+            driver.insert(keys, f'/dev/null/{i}.tif', skip_metadata=True)
+
+
+def bench_session(db_uri, timestamps, radar):
+    t0 = time.perf_counter()
+    session = IngestSession(db_uri)
+    session.load_timestamps(timestamps, radar)
+    skipped = sum(session.exists(timestamp, radar, 'DBZH') for timestamp in timestamps)
+    return (time.perf_counter() - t0)/len(timestamps), skipped
+
+
+def bench_full_listing(db_uri, timestamps, radar):
+    driver = tc.get_driver(db_uri)
+    t0 = time.perf_counter()
+    skipped = sum(dataset_keys(timestamp, radar, 'DBZH') in driver.get_datasets() for timestamp in timestamps)
+    return (time.perf_counter() - t0)/len(timestamps), skipped
+
+
+if __name__ == '__main__':
+    radar = RADARS[0]
+    timestamps = [datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=5*i) for i in range(EVENT_TIMESTAMPS)]
+    print(f'{"datasets":>10} {"session ms/ts":>14} {"listing ms/ts":>14}')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n in CATALOGUE_SIZES:
+            db_uri = os.path.join(tmpdir, f'tc{n}.sqlite')
+            driver = tc.get_driver(db_uri)
+            driver.create(KEYS)
+            fill_catalogue(driver, n)
+            t_session, skipped = bench_session(db_uri, timestamps, radar)
+            t_listing, _ = bench_full_listing(db_uri, timestamps, radar)
+            print(f'{n:>10} {t_session*1e3:>14.3f} {t_listing*1e3:>14.3f}  ({skipped} skipped)')
@@ -0,0 +1,56 @@
+"""Benchmark the playback slider marks for event lengths from 1 hour to 30 days.
+
+Compares the original per-timestamp lookup with the vectorised
+timestamp_marks, both on the first call and on a memoised repeat call, and
+checks that both produce the same labelled marks. The new implementation
+is given the datetime64 timeline the event summary holds.
+"""
+import time
+import datetime
+
+import numpy as np
+from matplotlib.dates import ConciseDateFormatter, AutoDateLocator, date2num, MINUTELY
+
+from recall.utils import timestamp_marks
+
+
+EVENT_LENGTHS = (datetime.timedelta(hours=1), datetime.timedelta(hours=6), datetime.timedelta(days=1),
+                 datetime.timedelta(days=7), datetime.timedelta(days=30))
+CADENCE = datetime.timedelta(minutes=5)
+
+
+def timestamp_marks_loop(timestamps):
+    """Original implementation with a linear tick lookup for every timestamp."""
+    locator = AutoDateLocator()
+    locator.intervald[MINUTELY] = [5, 10, 15, 30]
+    formatter = ConciseDateFormatter(locator)
+    ticks = locator.tick_values(timestamps[0], timestamps[-1])
+    formatted_ticks = formatter.format_ticks(ticks)
+    marks = {}
+    for i, timestamp in enumerate(timestamps):
+        ts = date2num(timestamp)
+        if ts in ticks:
+            marks[i] = formatted_ticks[ticks.tolist().index(ts)]
+        else:
+            marks[i] = ''
+    return marks
+
+
+def timed(fun, *args):
+    t0 = time.perf_counter()
+    result = fun(*args)
+    return result, time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+    print(f'{"length":>16} {"frames":>7} {"loop ms":>9} {"first ms":>9} {"cached ms":>10} {"marks":>6}')
+    for length in EVENT_LENGTHS:
+        start = datetime.datetime(2023, 8, 1)
+        n = length//CADENCE + 1
+        timestamps = [start + i*CADENCE for i in range(n)]
+        old, t_loop = timed(timestamp_marks_loop, timestamps)
+        timeline = np.array(timestamps, dtype='datetime64[m]')
+        new, t_first = timed(timestamp_marks, timeline)
+        _, t_cached = timed(timestamp_marks, timeline)
+        assert new == {i: label for i, label in old.items() if label}, length
+        print(f'{str(length):>16} {n:>7} {t_loop*1e3:>9.2f} {t_first*1e3:>9.2f} {t_cached*1e3:>10.3f} {len(new):>6}')
@@ -0,0 +1,178 @@
+"""Streaming export of the event catalogue.
+
+Events are read from the database in chunks and written out chunk by chunk
+as toml, json lines, csv or GeoParquet, so memory use does not grow with the
+catalogue size. The export is served by the `/export/events.<format>` route,
+which takes optional `radar` and `tag` names (repeatable) and `start` and
+`end` times as query parameters.
+"""
+
+import io
+import csv
+import json
+import struct
+import datetime
+import importlib.util
+from itertools import islice
+
+from flask import Blueprint, Response, abort, request, stream_with_context
+import tomli_w
+
+from recall.database.connection import db
+from recall.database.importer import join_tags
+from recall.database.models import Tag
+from recall.database.queries import export_rows, EXPORT_CHUNK_SIZE
+from recall.database.radars import radars
+
+
+FIELDS = ('id', 'radar', 'start_time', 'end_time', 'description', 'tags', 'lat', 'lon')
+MIMETYPES = {
+    'toml': 'application/toml',
+    'jsonl': 'application/jsonl',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+export_bp = Blueprint('export', __name__, url_prefix='/export')
+
+
+def chunked(rows, size=EXPORT_CHUNK_SIZE):
+    """Event records with radar coordinates in lists of up to size records."""
+    coords = {radar.name: radar.coords for radar in radars.all()}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        records = []
+        for row in chunk:
+            record = row._asdict()
+            record['lat'], record['lon'] = coords.get(row.radar, (None, None))
+            records.append(record)
+        yield records
+
+
+def write_toml(chunks):
+    for records in chunks:
+        # toml has no null values
+        events = [{key: value for key, value in record.items() if value is not None} for record in records]
+        yield tomli_w.dumps({'event': events}) + '\n'
+
+
+def write_jsonl(chunks):
+    for records in chunks:
+        yield ''.join(json.dumps(record, default=lambda t: t.isoformat()) + '\n' for record in records)
+
+
+def write_csv(chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(FIELDS)
+    for records in chunks:
+        for record in records:
+            row = {**record, 'tags': join_tags(record['tags'])}
+            writer.writerow([row[field] for field in FIELDS])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what has been written so far."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def wkb_point(lon, lat):
+    if lon is None:
+        return None
+    return struct.pack('<BIdd', 1, 1, lon, lat)
+
+
+def write_parquet(chunks):
+    """GeoParquet with one row group per chunk and radar locations as point geometry."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    geo = {
+        'version': '1.0.0',
+        'primary_column': 'geometry',
+        'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': ['Point']}},  # OGC:CRS84
+    }
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('radar', pa.string()),
+        ('start_time', pa.timestamp('s')),
+        ('end_time', pa.timestamp('s')),
+        ('description', pa.string()),
+        ('tags', pa.list_(pa.string())),
+        ('lat', pa.float64()),
+        ('lon', pa.float64()),
+        ('geometry', pa.binary()),
+    ], metadata={'geo': json.dumps(geo)})
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for records in chunks:
+            rows = [{**record, 'geometry': wkb_point(record['lon'], record['lat'])} for record in records]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {
+    'toml': write_toml,
+    'jsonl': write_jsonl,
+    'csv': write_csv,
+    'parquet': write_parquet,
+}
+
+
+def parse_time_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f'Invalid {name} time: {value}')
+
+
+@export_bp.route('/events.<fmt>')
+def export_events(fmt: str):
+    """Stream the events matching the query parameters in the requested format."""
+    if fmt not in WRITERS:
+        abort(404)
+    if fmt == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        abort(501, 'Parquet export requires pyarrow.')
+    start = parse_time_arg('start')
+    end = parse_time_arg('end')
+    tag_ids = None
+    tag_names = request.args.getlist('tag')
+    if tag_names:
+        tag_ids = db.session.scalars(db.select(Tag.id).where(Tag.name.in_(tag_names))).all()
+    rows = export_rows(radar_names=request.args.getlist('radar'), tag_ids=tag_ids, start=start, end=end)
+    print(f'Exporting events as {fmt}')
+    return Response(
+        stream_with_context(WRITERS[fmt](chunked(rows))),
+        mimetype=MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename=events.{fmt}'},
+    )
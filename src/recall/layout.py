@@ -61,6 +61,14 @@ def create_layout():
         save_event_button,
         delete_event_button,
     ], className=BUTTONS_GRID_CLASS)
+    animation_export = dbc.InputGroup([
+        dbc.Select(
+            id='animation-format',
+            options=[{'label': fmt.upper(), 'value': fmt} for fmt in ('gif', 'webp', 'mp4')],
+            value='gif',
+        ),
+        dbc.Button('Export animation', id='export-animation', color='secondary', disabled=True),
+    ], class_name='mt-3')
     event_form_card = dbc.Card(
         dbc.CardBody([
             html.H4('Event details', className='card-title'),
@@ -72,13 +80,25 @@ def create_layout():
                 event_buttons,
             ]),
             dbc.Progress(id='event-form-progress', class_name='d-none'),
+            animation_export,
+            dcc.Download(id='download-animation'),
+            html.P(id='animation-status', className='mt-2 mb-0'),
         ]),
         class_name='mt-3'
     )
     event_controls_tab_content = html.Div([
         dbc.Card(
             dbc.CardBody([
-                dcc.Dropdown(id='event-dropdown', placeholder='Select event...', className='mb-3'),
+                dcc.Dropdown(id='event-tag-filter', multi=True, placeholder='Filter by tags...', className='mb-2'),
+                dcc.Dropdown(id='event-dropdown', placeholder='Search events...', className='mb-1'),
+                dcc.Store(id='event-page-cursor'),
+                dcc.Store(id='event-search'),  # search term of the listed events
+                html.Div([
+                    dbc.Button('More events', id='event-dropdown-more', color='link', size='sm',
+                               class_name='p-0', disabled=True),
+                    dbc.Button('Clear search', id='event-search-clear', color='link', size='sm',
+                               class_name='p-0', disabled=True),
+                ], className='d-flex gap-3 mb-2'),
                 html.Div([
                     PlaybackSliderAIO(
                         aio_id='playback',
@@ -118,14 +138,48 @@ def create_layout():
             dbc.CardBody([
                 html.P('Ingest all events to the terracotta database.'),
                 dbc.Button('Ingest all', id='ingest-all', color='primary'),
+                dbc.Progress(id='ingest-progress', class_name='d-none'),
+                html.P(id='ingest-status', className='mt-3 mb-0'),
+                dcc.Store(id='ingest-job'),  # ids of the queued ingest tasks
+                dcc.Interval(id='ingest-poll', interval=2000, disabled=True),
+            ]),
+            class_name='mt-3'
+        ),
+        dbc.Card(
+            dbc.CardBody([
+                html.P('Reload the radar sites from the database.'),
+                dbc.Button('Reload radars', id='reload-radars', color='primary'),
+            ]),
+            class_name='mt-3'
+        ),
+        dbc.Card(
+            dbc.CardBody([
+                html.P('Export events, optionally filtered by radar, tags and time range.'),
+                dcc.Dropdown(id='export-radars', multi=True, placeholder='All radars', className='mb-3'),
+                dcc.Dropdown(id='export-tags', multi=True, placeholder='All tags', className='mb-3'),
+                dcc.DatePickerRange(id='export-dates', display_format='YYYY-MM-DD', className='mb-3'),
+                dbc.InputGroup([
+                    dbc.Select(
+                        id='export-format',
+                        options=[{'label': fmt.upper(), 'value': fmt} for fmt in ('toml', 'jsonl', 'csv', 'parquet')],
+                        value='toml',
+                    ),
+                    dbc.Button('Export', id='export-events', color='primary', href='/export/events.toml',
+                               external_link=True),
+                ]),
             ]),
             class_name='mt-3'
         ),
         dbc.Card(
             dbc.CardBody([
-                html.P('Export all events.'),
-                dbc.Button('Export as toml', id='btn-export-toml', color='primary'),
-                dcc.Download(id='download-toml'),
+                html.P('Import events from a toml, csv or json lines file. '
+                       'Events overlapping existing events are skipped.'),
+                dcc.Upload(
+                    dbc.Button('Import events', color='primary'),
+                    id='upload-events',
+                    accept='.toml,.csv,.jsonl,.ndjson,.json',
+                ),
+                html.P(id='import-status', className='mt-3 mb-0'),
             ]),
             class_name='mt-3'
         ),
@@ -138,6 +192,7 @@ def create_layout():
     return dbc.Container([
         dcc.Interval(id='startup-interval', interval=1, n_intervals=0, max_intervals=1),
         dcc.Store(id='events-update-signal'),  # signal for updating the event dropdown
+        dcc.Store(id='radar-frames', data={}),  # tile URLs and labels of the radar frames
         dbc.Row([
             dbc.Col([
                 tabs
@@ -150,7 +205,7 @@ def create_layout():
                     ),
                     html.Div([
                         dl.Map(
-                            children=BASEMAP,
+                            children=[*BASEMAP, dl.LayerGroup(id='radar-layers')],
                             id='map', center=(61.9241, 25.7482), zoom=6,
                             style={'width': '100%', 'height': '100vh'}
                         )
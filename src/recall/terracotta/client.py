@@ -3,17 +3,28 @@
 import os
 import datetime
 
+from recall.colormaps import product_colormap
+
 
 TC_URL = os.environ.get('TC_URL', 'http://localhost:8088')
+# URL of the terracotta server as seen from the backend
+TC_INTERNAL_URL = os.environ.get('TC_INTERNAL_URL', TC_URL)
 
 
-def get_singleband_url(timestamp: datetime.datetime, radar_name: str, product: str, **kws):
+def get_singleband_url(timestamp: datetime.datetime, radar_name: str, product: str, tc_url: str = TC_URL, **kws):
     """Get the XYZ URL for a radar image."""
     product = product.upper()
-    url = f'{TC_URL}/singleband/{timestamp.strftime("%Y%m%d%H%M")}/{radar_name}/{product}/'
+    url = f'{tc_url}/singleband/{timestamp.strftime("%Y%m%d%H%M")}/{radar_name}/{product}/'
     url += '{z}/{x}/{y}.png'
     # add query parameters
     if kws:
         url += '?'
         url += '&'.join([f'{k}={v}' for k, v in kws.items()])
     return url
+
+
+def get_radar_url(timestamp: datetime.datetime, radar_name: str, product: str = 'DBZH', tc_url: str = TC_URL):
+    """Get the XYZ URL for a radar image as shown on the map."""
+    return get_singleband_url(timestamp, radar_name, product, tc_url=tc_url,
+                              colormap=product_colormap(product).versioned_name,
+                              stretch_range='[0,255]')
@@ -0,0 +1,112 @@
+"""Discover available radar products by listing the S3 bucket.
+
+Each `{YYYY/MM/DD}/{radar}/` prefix is listed and the result is kept as a
+manifest of timestamps and the products available for them. Manifests of past
+days are cached for long, while the manifest of a day that may still get new
+scans is listed again after about one scan interval.
+"""
+
+import os
+import datetime
+
+from recall.cache import TTLCache
+from recall.database import SCAN_INTERVAL
+
+
+# Products in order of preference. DBZ-1 is an older name of the same product.
+PRODUCTS = ('DBZH', 'DBZ-1')
+# manifests of past days
+MANIFEST_TTL = int(os.environ.get('RECALL_MANIFEST_TTL', 24*3600))  # seconds
+# manifests of days that may still get new scans
+RECENT_MANIFEST_TTL = int(os.environ.get('RECALL_RECENT_MANIFEST_TTL', SCAN_INTERVAL.total_seconds()))
+# time after the end of a day until which late scans are still expected
+UPLOAD_DELAY = datetime.timedelta(hours=int(os.environ.get('RECALL_UPLOAD_DELAY_HOURS', 2)))
+
+_manifests = TTLCache(maxsize=1024, ttl=MANIFEST_TTL)
+
+
+def s3prefix(date: datetime.date, radar: str):
+    """S3 key prefix of all files of a radar on a given day."""
+    return f'{date.strftime("%Y/%m/%d")}/{radar}/'
+
+
+def parse_key(key: str):
+    """Parse timestamp, radar and product from an S3 key.
+
+    Returns None if the key is not a radar GeoTIFF.
+    """
+    filename = key.rsplit('/', 1)[-1]
+    if not filename.endswith('.tif'):
+        return None
+    try:
+        tstr, radar, product = filename[:-len('.tif')].split('_', 2)
+        timestamp = datetime.datetime.strptime(tstr, '%Y%m%d%H%M')
+    except ValueError:
+        return None
+    return timestamp, radar, product
+
+
+def list_day(bucket, date: datetime.date, radar: str):
+    """List the products available for each timestamp of a day.
+
+    `bucket` is a boto3 S3 Bucket resource.
+    """
+    manifest = {}
+    for obj in bucket.objects.filter(Prefix=s3prefix(date, radar)):
+        parsed = parse_key(obj.key)
+        if parsed is None or parsed[1] != radar:
+            continue
+        timestamp, _, product = parsed
+        manifest.setdefault(timestamp, set()).add(product)
+    return manifest
+
+
+def manifest_ttl(date: datetime.date, now=None):
+    """Cache time of the manifest of a day in seconds.
+
+    The scan times are in UTC.
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    day_end = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time())
+    if now < day_end + UPLOAD_DELAY:
+        return RECENT_MANIFEST_TTL
+    return MANIFEST_TTL
+
+
+def day_manifest(bucket, date: datetime.date, radar: str):
+    """Cached manifest of the products available for a radar on a given day."""
+    key = (bucket.name, date, radar)
+    manifest = _manifests.get(key)
+    if manifest is None:
+        manifest = list_day(bucket, date, radar)
+        _manifests.set(key, manifest, ttl=manifest_ttl(date))
+    return manifest
+
+
+def invalidate_manifests():
+    """Forget all cached manifests."""
+    _manifests.invalidate()
+
+
+def plan(bucket, start_time: datetime.datetime, end_time: datetime.datetime, radar: str, products=PRODUCTS):
+    """List the (timestamp, product) pairs to ingest for a time span.
+
+    For each timestamp found in the bucket, the first available product in
+    order of preference is chosen. Timestamps without any of the products are
+    left out.
+    """
+    pairs = []
+    date = start_time.date()
+    while date <= end_time.date():
+        manifest = day_manifest(bucket, date, radar)
+        for timestamp in sorted(manifest):
+            if not start_time <= timestamp < end_time:
+                continue
+            available = manifest[timestamp]
+            for product in products:
+                if product in available:
+                    pairs.append((timestamp, product))
+                    break
+        date += datetime.timedelta(days=1)
+    return pairs
@@ -0,0 +1,160 @@
+"""Local on-disk mirror of the radar GeoTIFF bucket.
+
+Mirrored files are registered with terracotta by their local path, so tiles
+are rendered from local disk instead of S3. The size bound applies to the
+whole mirror directory, which may be shared by several worker processes and
+containers, and the least recently used files are evicted first. Use is
+tracked by file access and modification times, so tile reads by terracotta
+count too where the file system records access times. Evicted files are
+passed to an `on_evict` callback before removal, e.g. to register their S3
+path with terracotta instead. `resync` mirrors files again while they fit.
+"""
+
+import os
+import time
+import fcntl
+import threading
+
+
+MIRROR_ENABLED = os.environ.get('RECALL_MIRROR', '').lower() in ('1', 'true', 'yes')
+MIRROR_DIR = os.environ.get('RECALL_MIRROR_DIR', '/tmp/recall/geotiff')
+MIRROR_MAX_BYTES = int(float(os.environ.get('RECALL_MIRROR_MAX_BYTES', 20e9)))
+# the shared directory is rescanned for files of other processes at least this often
+MIRROR_SCAN_INTERVAL = float(os.environ.get('RECALL_MIRROR_SCAN_INTERVAL', 60))  # seconds
+# files of datasets ingested within this time are mirrored again by resync
+MIRROR_RESYNC_DAYS = float(os.environ.get('RECALL_MIRROR_RESYNC_DAYS', 7))
+# maximum number of files considered per resync
+MIRROR_RESYNC_MAX_FILES = int(os.environ.get('RECALL_MIRROR_RESYNC_MAX_FILES', 10000))
+LOCK_FILENAME = '.evict.lock'
+
+
+def s3key(s3path: str) -> str:
+    """Object key of an s3:// path."""
+    return s3path.split('://', 1)[-1].split('/', 1)[1]
+
+
+class GeoTiffMirror:
+    """Size bounded local copy of files in an S3 bucket.
+
+    `bucket` is a boto3 S3 Bucket resource. Files are stored under
+    `directory` using their object keys as relative paths. `on_evict` is
+    called with the local path of each file before it is evicted. If it
+    raises, the file is kept.
+    """
+
+    def __init__(self, bucket, directory: str = MIRROR_DIR, max_bytes: int = MIRROR_MAX_BYTES, on_evict=None):
+        self.bucket = bucket
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._size = 0  # directory size at the last scan plus own downloads since
+        self._scanned_at = None
+        os.makedirs(directory, exist_ok=True)
+
+    def scan(self):
+        """List the mirrored files as (last use, size, path), least recently used first.
+
+        Also updates the size of the mirror.
+        """
+        found = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith('.tif'):  # partial downloads and the lock file
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:  # evicted by another process
+                    continue
+                found.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+        found.sort()
+        with self._lock:
+            self._size = sum(size for _, size, _ in found)
+            self._scanned_at = time.monotonic()
+        return found
+
+    @property
+    def size(self) -> int:
+        """Total size of the mirrored files in bytes as of the last scan."""
+        return self._size
+
+    def local_path(self, s3path: str) -> str:
+        return os.path.join(self.directory, s3key(s3path))
+
+    def contains(self, s3path: str) -> bool:
+        return os.path.exists(self.local_path(s3path))
+
+    def fetch(self, s3path: str) -> str:
+        """Get the local path of a file, downloading it if needed."""
+        path = self.local_path(s3path)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+        self.bucket.download_file(s3key(s3path), tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += os.path.getsize(path)
+            stale = self._scanned_at is None or time.monotonic() - self._scanned_at > MIRROR_SCAN_INTERVAL
+        if stale or self._size > self.max_bytes:
+            self.evict(keep=(path,))
+        return path
+
+    def evict(self, keep=()):
+        """Remove least recently used files until the mirror directory fits in size.
+
+        One process at a time evicts from a directory. Returns the number of
+        files removed.
+        """
+        n = 0
+        with open(os.path.join(self.directory, LOCK_FILENAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            files = self.scan()
+            excess = self._size - self.max_bytes
+            for _, size, path in files:
+                if excess <= 0:
+                    break
+                if path in keep:
+                    continue
+                if self.on_evict is not None:
+                    try:
+                        self.on_evict(path)
+                    except Exception as e:
+                        print(f'Keeping {path} in the mirror: {e}')
+                        continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                excess -= size
+                n += 1
+            with self._lock:
+                self._size = self.max_bytes + excess
+        if n:
+            print(f'Evicted {n} files from the mirror')
+        return n
+
+    def resync(self, s3paths):
+        """Mirror the given files, in order, while they fit in the free space of the mirror.
+
+        Files larger than the remaining free space are skipped, so resyncing
+        never evicts. Returns a dictionary of local paths of the mirrored
+        files by S3 path, including files that were mirrored already.
+        """
+        self.scan()
+        free = self.max_bytes - self._size
+        mirrored = {}
+        for s3path in s3paths:
+            path = self.local_path(s3path)
+            if not os.path.exists(path):
+                if free <= 0:
+                    continue
+                size = self.bucket.Object(s3key(s3path)).content_length
+                if size > free:
+                    continue
+                self.fetch(s3path)
+                free -= size
+            mirrored[s3path] = path
+        return mirrored
@@ -0,0 +1,89 @@
+"""Pre-warm terracotta tiles of ingested events.
+
+Requesting the tiles of every frame once after ingest means the first viewing
+of an event does not have to wait for on-demand rendering.
+
+The tiles are requested through TC_INTERNAL_URL, which is load balanced over
+the terracotta gunicorn workers. Each worker has its own in-memory raster
+cache, so a tile request warms only the worker that served it, and a later
+request for the same tile hits the warm cache only if it is served by the
+same worker. The files of the local GeoTIFF mirror are therefore also read
+into the OS page cache, which is shared by all workers on the host.
+"""
+
+import os
+import math
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+PREWARM_ENABLED = os.environ.get('RECALL_PREWARM', 'true').lower() in ('1', 'true', 'yes')
+PREWARM_CONCURRENCY = int(os.environ.get('RECALL_PREWARM_CONCURRENCY', 8))
+# typical size of the map element in pixels
+VIEWPORT_SIZE = (
+    int(os.environ.get('RECALL_PREWARM_VIEWPORT_WIDTH', 1280)),
+    int(os.environ.get('RECALL_PREWARM_VIEWPORT_HEIGHT', 1080)),
+)
+TILE_SIZE = 256
+
+
+def lonlat2pixel(lat: float, lon: float, zoom: int):
+    """Web Mercator pixel coordinates of a location at a zoom level."""
+    n = TILE_SIZE * 2**zoom
+    x = (lon + 180)/360*n
+    y = (1 - math.asinh(math.tan(math.radians(lat)))/math.pi)/2*n
+    return x, y
+
+
+def viewport_tiles(center, zoom: int, size=VIEWPORT_SIZE):
+    """List the (z, x, y) tiles visible in a viewport centred at (lat, lon)."""
+    cx, cy = lonlat2pixel(*center, zoom)
+    width, height = size
+    n_max = 2**zoom - 1
+    x0 = max(0, int((cx - width/2)//TILE_SIZE))
+    x1 = min(n_max, int((cx + width/2)//TILE_SIZE))
+    y0 = max(0, int((cy - height/2)//TILE_SIZE))
+    y1 = min(n_max, int((cy + height/2)//TILE_SIZE))
+    return [(zoom, x, y) for x in range(x0, x1+1) for y in range(y0, y1+1)]
+
+
+def fetch_tile(url: str, timeout: float = 30) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+        return True
+    except OSError:
+        return False
+
+
+def warm_files(paths):
+    """Read files ahead into the OS page cache.
+
+    Returns the total size of the files in bytes.
+    """
+    n_bytes = 0
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:  # evicted from the mirror
+            continue
+        try:
+            size = os.fstat(fd).st_size
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+            n_bytes += size
+        finally:
+            os.close(fd)
+    return n_bytes
+
+
+def prewarm(url_templates, tiles, max_workers=PREWARM_CONCURRENCY):
+    """Request the given tiles for each XYZ URL template.
+
+    Returns the number of requested and failed tiles and the elapsed time.
+    """
+    urls = [template.format(z=z, x=x, y=y) for template in url_templates for z, x, y in tiles]
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        n_failed = sum(not ok for ok in executor.map(fetch_tile, urls))
+    return dict(tiles=len(urls), failed=n_failed, elapsed=time.monotonic()-t0)
@@ -1,18 +1,52 @@
-from matplotlib.dates import ConciseDateFormatter, AutoDateLocator, date2num, MINUTELY
+from functools import lru_cache
 
+import numpy as np
 
-def timestamp_marks(timestamps):
-    """Format the timestamp labels using ConciseDateFormatter and AutoDateLocator."""
+
+MARKS_CACHE_SIZE = 256
+MINUTES_PER_DAY = 24*60
+
+
+@lru_cache(maxsize=MARKS_CACHE_SIZE)
+def _ticks(start: np.datetime64, end: np.datetime64):
+    """Tick positions as datetime64[m] and their labels between start and end."""
+    from matplotlib.dates import ConciseDateFormatter, AutoDateLocator, MINUTELY
     locator = AutoDateLocator()
     locator.intervald[MINUTELY] = [5, 10, 15, 30]
     formatter = ConciseDateFormatter(locator)
-    ticks = locator.tick_values(timestamps[0], timestamps[-1])
-    formatted_ticks = formatter.format_ticks(ticks)
-    marks = {}
-    for i, timestamp in enumerate(timestamps):
-        ts = date2num(timestamp)
-        if ts in ticks:
-            marks[i] = formatted_ticks[ticks.tolist().index(ts)]
-        else:
-            marks[i] = ''
-    return marks
\ No newline at end of file
+    ticks = locator.tick_values(start.astype(object), end.astype(object))
+    labels = formatter.format_ticks(ticks)
+    # matplotlib date numbers are float days since the unix epoch
+    positions = np.round(np.asarray(ticks)*MINUTES_PER_DAY).astype('int64').astype('datetime64[m]')
+    return positions, tuple(labels)
+
+
+def _marks(timestamps: np.ndarray) -> dict:
+    ticks, labels = _ticks(timestamps[0], timestamps[-1])
+    idx = np.searchsorted(timestamps, ticks)
+    inside = idx < timestamps.size
+    hit = np.zeros_like(inside)
+    hit[inside] = timestamps[idx[inside]] == ticks[inside]
+    return {int(i): labels[j] for j, i in zip(np.flatnonzero(hit), idx[hit])}
+
+
+@lru_cache(maxsize=MARKS_CACHE_SIZE)
+def _regular_marks(start: np.datetime64, end: np.datetime64, cadence: np.timedelta64) -> dict:
+    return _marks(np.arange(start, end + cadence, cadence))
+
+
+def timestamp_marks(timestamps) -> dict:
+    """Format the timestamp labels using ConciseDateFormatter and AutoDateLocator.
+
+    Only the indices of the tick positions get a mark. Results for evenly
+    spaced timestamps are memoised by start, end and cadence.
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[m]')
+    if timestamps.size == 0:
+        return {}
+    steps = np.diff(timestamps)
+    if steps.size and steps[0] > np.timedelta64(0) and (steps == steps[0]).all():
+        marks = _regular_marks(timestamps[0], timestamps[-1], steps[0])
+    else:
+        marks = _marks(timestamps)
+    return dict(marks)
@@ -0,0 +1,70 @@
+"""Cache versions shared by all processes through Redis.
+
+In-process caches include the current versions of the data they depend on in
+their cache keys. Writers bump the versions, so that the cached entries of
+every web and celery worker process are invalidated at once, whichever
+process made the change. If Redis is unavailable, the versions read as None
+and the caches fall back to expiring their entries after a TTL.
+"""
+
+import os
+import time
+from typing import List, Optional
+
+import redis
+
+
+REDIS_URL = os.environ.get('RECALL_REDIS_URL', os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+KEY_PREFIX = 'recall:version:'
+# events in general, e.g. after bulk imports
+EVENTS = 'events'
+# ingest states of all events
+INGEST = 'ingest'
+# Redis is not tried again for this long after a failure
+RETRY_INTERVAL = 30  # seconds
+
+_client = None
+_down_until = 0.0
+
+
+def client() -> redis.Redis:
+    """Redis client of this process, created on first use."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _client
+
+
+def event_key(event_id: int) -> str:
+    return f'event:{event_id}'
+
+
+def _failed(e):
+    global _down_until
+    _down_until = time.monotonic() + RETRY_INTERVAL
+    print(f'Cache versions unavailable for {RETRY_INTERVAL} s: {e}')
+
+
+def get_versions(*names: str) -> List[Optional[int]]:
+    """Current versions of the named data."""
+    if time.monotonic() < _down_until:
+        return [None]*len(names)
+    try:
+        values = client().mget([KEY_PREFIX + name for name in names])
+    except redis.RedisError as e:
+        _failed(e)
+        return [None]*len(names)
+    return [int(value or 0) for value in values]
+
+
+def bump(*names: str):
+    """Increment the versions of the named data."""
+    if not names:
+        return
+    try:
+        with client().pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.incr(KEY_PREFIX + name)
+            pipe.execute()
+    except redis.RedisError as e:
+        _failed(e)
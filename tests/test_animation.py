@@ -0,0 +1,32 @@
+import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from recall import animation
+
+
+class EmptyDriver:
+    def get_datasets(self, where=None):
+        return {}
+
+
+@pytest.fixture
+def event(monkeypatch):
+    start = datetime.datetime(2023, 8, 28, 10)
+    timeline = np.array([start, start + datetime.timedelta(minutes=5)], dtype='datetime64[m]')
+    monkeypatch.setattr(animation, 'event_timeline', lambda event, product: timeline)
+    monkeypatch.setattr(animation, 'get_driver', EmptyDriver)
+    return SimpleNamespace(id=1, radar=SimpleNamespace(name='fikor'), start_time=start,
+                           end_time=start + datetime.timedelta(minutes=5))
+
+
+def test_render_event_without_frames(event):
+    with pytest.raises(ValueError, match='No ingested frames'):
+        animation.render_event(event)
+
+
+def test_render_event_unsupported_format(event):
+    with pytest.raises(ValueError, match='Unsupported animation format'):
+        animation.render_event(event, fmt='avi')
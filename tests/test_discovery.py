@@ -0,0 +1,79 @@
+import datetime
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from recall.terracotta import discovery
+from recall.terracotta.discovery import list_day, plan, manifest_ttl
+
+
+BUCKET = 'fmi-opendata-radar-geotiff'
+KEYS = [
+    '2023/08/28/fikor/202308281000_fikor_DBZH.tif',
+    '2023/08/28/fikor/202308281005_fikor_DBZ-1.tif',
+    '2023/08/28/fikor/202308281005_fikor_DBZH.tif',
+    '2023/08/28/fikor/202308281010_fikor_VRAD.tif',
+    '2023/08/28/fikor/202308281015_fikor_DBZ-1.tif',
+    '2023/08/28/fikor/202308281015_fikor_DBZH.json',
+    '2023/08/28/fikor/202308282355_fikor_DBZH.tif',
+    '2023/08/29/fikor/202308290000_fikor_DBZH.tif',
+    '2023/08/28/fivih/202308281000_fivih_DBZH.tif',
+]
+
+
+@pytest.fixture
+def bucket():
+    with mock_aws():
+        s3 = boto3.resource('s3', region_name='eu-west-1')
+        bucket = s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': 'eu-west-1'})
+        for key in KEYS:
+            bucket.put_object(Key=key, Body=b'')
+        discovery.invalidate_manifests()
+        yield bucket
+        discovery.invalidate_manifests()
+
+
+def test_list_day(bucket):
+    manifest = list_day(bucket, datetime.date(2023, 8, 28), 'fikor')
+    assert manifest == {
+        datetime.datetime(2023, 8, 28, 10, 0): {'DBZH'},
+        datetime.datetime(2023, 8, 28, 10, 5): {'DBZH', 'DBZ-1'},
+        datetime.datetime(2023, 8, 28, 10, 10): {'VRAD'},
+        datetime.datetime(2023, 8, 28, 10, 15): {'DBZ-1'},
+        datetime.datetime(2023, 8, 28, 23, 55): {'DBZH'},
+    }
+
+
+def test_plan_prefers_products_in_order(bucket):
+    pairs = plan(bucket, datetime.datetime(2023, 8, 28, 10), datetime.datetime(2023, 8, 28, 10, 20), 'fikor')
+    assert pairs == [
+        (datetime.datetime(2023, 8, 28, 10, 0), 'DBZH'),
+        (datetime.datetime(2023, 8, 28, 10, 5), 'DBZH'),
+        (datetime.datetime(2023, 8, 28, 10, 15), 'DBZ-1'),
+    ]
+
+
+def test_plan_spans_days_end_exclusive(bucket):
+    start = datetime.datetime(2023, 8, 28, 23, 55)
+    assert plan(bucket, start, datetime.datetime(2023, 8, 29), 'fikor') == [(start, 'DBZH')]
+    assert plan(bucket, start, datetime.datetime(2023, 8, 29, 0, 5), 'fikor') == [
+        (start, 'DBZH'),
+        (datetime.datetime(2023, 8, 29), 'DBZH'),
+    ]
+
+
+def test_plan_caches_manifests(bucket):
+    span = (datetime.datetime(2023, 8, 28, 10), datetime.datetime(2023, 8, 28, 11))
+    first = plan(bucket, *span, 'fikor')
+    bucket.put_object(Key='2023/08/28/fikor/202308281020_fikor_DBZH.tif', Body=b'')
+    assert plan(bucket, *span, 'fikor') == first
+    discovery.invalidate_manifests()
+    assert len(plan(bucket, *span, 'fikor')) == len(first) + 1
+
+
+def test_manifest_ttl():
+    date = datetime.date(2023, 8, 28)
+    assert manifest_ttl(date, now=datetime.datetime(2023, 8, 28, 12)) == discovery.RECENT_MANIFEST_TTL
+    assert manifest_ttl(date, now=datetime.datetime(2023, 8, 29, 1)) == discovery.RECENT_MANIFEST_TTL
+    assert manifest_ttl(date, now=datetime.datetime(2023, 9, 1)) == discovery.MANIFEST_TTL
@@ -0,0 +1,19 @@
+import pytest
+
+from recall.database.importer import join_tags, split_tags, parse_tags
+
+
+@pytest.mark.parametrize('names', [
+    [],
+    ['rain', 'convective'],
+    ['a;b', 'c\\', 'x\\;y', 'ends with;'],
+])
+def test_tags_survive_csv_round_trip(names):
+    assert split_tags(join_tags(names)) == names
+
+
+def test_parse_tags():
+    assert parse_tags('rain; convective ;;') == ['rain', 'convective']
+    assert parse_tags('squall\\;line;rain') == ['squall;line', 'rain']
+    assert parse_tags(['rain', ' ']) == ['rain']
+    assert parse_tags(None) == []
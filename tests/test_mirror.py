@@ -0,0 +1,69 @@
+import os
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from recall.terracotta.mirror import GeoTiffMirror
+
+
+BUCKET = 'fmi-opendata-radar-geotiff'
+SIZE = 100
+
+
+def s3path(name):
+    return f's3://{BUCKET}/2023/08/28/fikor/{name}.tif'
+
+
+@pytest.fixture
+def bucket():
+    with mock_aws():
+        s3 = boto3.resource('s3', region_name='eu-west-1')
+        bucket = s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': 'eu-west-1'})
+        for name in 'abcd':
+            bucket.put_object(Key=f'2023/08/28/fikor/{name}.tif', Body=b'x'*SIZE)
+        bucket.put_object(Key='2023/08/28/fikor/large.tif', Body=b'x'*3*SIZE)
+        yield bucket
+
+
+def age(path, seconds):
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+def test_fetch_evicts_least_recently_used(bucket, tmp_path):
+    evicted = []
+    mirror = GeoTiffMirror(bucket, str(tmp_path), max_bytes=2*SIZE, on_evict=evicted.append)
+    a = mirror.fetch(s3path('a'))
+    b = mirror.fetch(s3path('b'))
+    age(a, 20)
+    age(b, 10)
+    mirror.fetch(s3path('a'))  # use a again
+    c = mirror.fetch(s3path('c'))
+    assert evicted == [b]
+    assert os.path.exists(a) and os.path.exists(c) and not os.path.exists(b)
+    assert mirror.size == 2*SIZE
+
+
+def test_evict_keeps_file_if_callback_fails(bucket, tmp_path):
+    def on_evict(path):
+        raise RuntimeError('still in use')
+    mirror = GeoTiffMirror(bucket, str(tmp_path), max_bytes=SIZE, on_evict=on_evict)
+    a = mirror.fetch(s3path('a'))
+    age(a, 10)
+    b = mirror.fetch(s3path('b'))
+    assert os.path.exists(a) and os.path.exists(b)
+    assert mirror.evict() == 0
+
+
+def test_resync_stays_within_max_bytes(bucket, tmp_path):
+    evicted = []
+    mirror = GeoTiffMirror(bucket, str(tmp_path), max_bytes=3*SIZE, on_evict=evicted.append)
+    mirror.fetch(s3path('a'))
+    paths = [s3path(name) for name in ('a', 'large', 'b', 'c', 'd')]
+    mirrored = mirror.resync(paths)
+    assert list(mirrored) == [s3path('a'), s3path('b'), s3path('c')]
+    assert not evicted
+    assert not os.path.exists(mirror.local_path(s3path('large')))
+    assert mirror.scan() and mirror.size == 3*SIZE